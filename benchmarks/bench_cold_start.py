@@ -0,0 +1,62 @@
+"""
+Cold-start cost of the cogs: import time and peak RSS, each module in a
+fresh interpreter. Optionally also time model loads.
+
+    python -m benchmarks.bench_cold_start [--load fasttext whisper]
+"""
+import argparse
+import subprocess
+import sys
+
+MODULES = [
+    "src.cogs.message_router",
+    "src.cogs.owl_commands",
+    "src.cogs.translation_watcher",
+    "src.cogs.voice_watcher",
+    "src.cogs.rating_watcher",
+    "src.cogs.gpt_mentions",
+    "src.cogs.dictionary_watcher",
+]
+
+_PROBE = """
+import asyncio, importlib, resource, sys, time
+t0 = time.perf_counter()
+for name in sys.argv[1].split(","):
+    importlib.import_module(name)
+elapsed = time.perf_counter() - t0
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+label = sys.argv[1] if "," not in sys.argv[1] else "(all cogs)"
+line = f"{label:<40} import {elapsed * 1000:8.1f} ms   peak RSS {rss:7.1f} MB"
+if len(sys.argv) > 2:
+    from src.services import warmup
+    async def load():
+        for model in sys.argv[2].split(","):
+            t = time.perf_counter()
+            await warmup._MODELS[model].get()
+            print(f"  load {model:<10} {time.perf_counter() - t:8.2f} s")
+    asyncio.run(load())
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    line += f"   after loads {rss:7.1f} MB"
+print(line)
+"""
+
+
+def _probe(modules, loads):
+    args = [sys.executable, "-c", _PROBE, ",".join(modules)]
+    if loads:
+        args.append(",".join(loads))
+    out = subprocess.run(args, capture_output=True, text=True)
+    print(out.stdout.rstrip() or out.stderr.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--load", nargs="*", default=[], help="models to load after importing (fasttext, whisper)")
+    args = parser.parse_args()
+    for module in MODULES:
+        _probe([module], [])
+    _probe(MODULES, args.load)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Micro-benchmark: one aiosqlite.connect per call vs the pooled connections,
+for get_settings / upsert_settings.
+
+    python -m benchmarks.bench_settings_store [iterations]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from src.persistence import db, guild_settings_store as store
+
+GUILDS = 50
+
+
+async def _run(label: str, n: int):
+    t0 = time.perf_counter()
+    for i in range(n):
+        store.invalidate()  # measure SQLite, not the in-process cache
+        await store.get_settings(i % GUILDS)
+    reads = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for i in range(n):
+        await store.upsert_settings(i % GUILDS, translation_channel_id=i + 1)
+    writes = time.perf_counter() - t0
+
+    print(
+        f"{label:<8} get_settings {reads / n * 1e6:9.1f} µs/op   "
+        f"upsert_settings {writes / n * 1e6:9.1f} µs/op"
+    )
+
+
+async def main(n: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db._DB_PATH = os.path.join(tmp, "bench.sqlite3")
+        await db.init_db()
+
+        await _run("connect", n)
+
+        await db.open_db()
+        try:
+            await _run("pooled", n)
+        finally:
+            await db.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
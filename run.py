@@ -5,19 +5,26 @@ import sys
 import discord
 from discord.ext import commands
 
-from src.config import BOT_PREFIX, load_env, OWL_INTENTS
+from src.config import BOT_PREFIX, load_env, OWL_INTENTS, WARMUP_MODELS
 from src.logging_config import setup_logging
-from src.persistence.db import init_db
+from src.persistence.db import close_db, init_db, open_db
+from src.services.http import close_session
+from src.services.warmup import warmup
 
 
 async def main():
     load_env()
     setup_logging()
 
+    # Settings are read on the first message, so the pool and schema must be ready first.
+    await open_db()
+    await init_db()
+
     bot = commands.Bot(command_prefix=BOT_PREFIX, intents=OWL_INTENTS, help_command=None)
 
-    # Load cogs
+    # Load cogs (the router first: the watchers register with it)
     for ext in [
+        "owl.cogs.message_router",
         "owl.cogs.owl_commands",
         "owl.cogs.translation_watcher",
         "owl.cogs.voice_watcher",
@@ -31,13 +38,21 @@ async def main():
         except Exception as e:
             logging.getLogger("owl").exception(f"Failed to load {ext}: {e}")
 
+    # Opt-in background preloads; handlers wait on the same load if they get there first.
+    warmup(WARMUP_MODELS)
+
     @bot.event
     async def on_ready():
         logging.getLogger("owl").info(f"Logged in as {bot.user} (ID: {bot.user.id})")
-        await init_db()
 
     from src.config import DISCORD_TOKEN
-    await bot.start(DISCORD_TOKEN)
+    try:
+        await bot.start(DISCORD_TOKEN)
+    finally:
+        if not bot.is_closed():
+            await bot.close()
+        await close_session()
+        await close_db()
 
 
 if __name__ == "__main__":
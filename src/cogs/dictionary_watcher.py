@@ -1,30 +1,101 @@
+import re
+from typing import List
+
 import discord
 from discord.ext import commands
 
-from src.persistence.guild_settings_store import get_settings
-from src.services.definitions import fetch_glossary
+from src.cogs.message_router import get_router
+from src.services import outbound
+from src.services.definitions import fetch_glossary, fetch_glossary_batch
+from src.services.lexicon_cache import normalize_word
 from src.services.translation import clean_mentions  # reuse mention cleaning
 
+MAX_TERMS = 25
+_LIST_MARKER_RE = re.compile(r"^(?:[-*•]|\d+[.)])\s*")
+
+def split_terms(text: str) -> List[str]:
+    """
+    Comma- or newline-separated terms, list markers stripped, duplicates dropped.
+    A single comma ("well, actually") is part of the phrase, not a list.
+    """
+    text = text.strip()
+    is_list = "\n" in text or text.count(",") >= 2
+    terms: List[str] = []
+    seen = set()
+    for part in re.split(r"[,\n]+", text) if is_list else [text]:
+        term = _LIST_MARKER_RE.sub("", part.strip()).strip().strip("`*_").strip()
+        key = normalize_word(term)
+        if key and key not in seen:
+            seen.add(key)
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+class GlossaryPages(discord.ui.View):
+    """Previous/next buttons over glossary pages; removed when the view times out."""
+
+    def __init__(self, pages: List[discord.Embed]):
+        super().__init__(timeout=300)
+        self.pages = pages
+        self.index = 0
+        self.message: discord.Message | None = None
+        self._sync()
+
+    def _sync(self):
+        self.previous.disabled = self.index == 0
+        self.next.disabled = self.index == len(self.pages) - 1
+
+    async def _show(self, interaction: discord.Interaction, index: int):
+        self.index = max(0, min(index, len(self.pages) - 1))
+        self._sync()
+        await interaction.response.edit_message(embed=self.pages[self.index], view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index - 1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index + 1)
+
+    async def on_timeout(self):
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
 class DictionaryWatcher(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
-            return
-        s = await get_settings(message.guild.id)
-        if not s.dictionary_channel_id or message.channel.id != s.dictionary_channel_id:
-            return
+    async def cog_load(self):
+        get_router(self.bot).register("dictionary", self.handle_message)
 
+    async def cog_unload(self):
+        router = self.bot.get_cog("MessageRouter")
+        if router:
+            router.unregister("dictionary")
+
+    async def handle_message(self, message: discord.Message):
         text = clean_mentions(message.content or "")
         text = text.strip().strip("`").strip("*").strip("_")
         if not text:
             return
 
-        # Keep it simple: use the entire message as the query term/phrase.
-        embed = await fetch_glossary(text)
-        await message.channel.send(embed=embed)
+        terms = split_terms(text)
+        if len(terms) <= 1:
+            # A single term or phrase: the whole message is the query.
+            embed = await fetch_glossary(terms[0] if terms else text)
+            await outbound.post_embed(message.channel, embed, "dictionary")
+            return
+
+        pages = await fetch_glossary_batch(terms)
+        if len(pages) == 1:
+            await outbound.post_embed(message.channel, pages[0], "dictionary")
+            return
+        view = GlossaryPages(pages)
+        view.message = await outbound.send_embed(message.channel, pages[0], "dictionary", view=view)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(DictionaryWatcher(bot))
@@ -1,49 +1,98 @@
+import asyncio
+import logging
 import re
+import time
+from typing import Dict, List, Optional, Tuple
+
 import discord
 from discord.ext import commands
 
-from src.embeds import result_embed
-from src.persistence.guild_settings_store import get_settings
-from src.services.gpt_utils import get_client
+from src.cogs.message_router import MENTION_EXCLUDED, get_router
+from src.config import CHANNEL_BUFFER_SIZE, MENTION_STREAMING, MENTION_EDIT_INTERVAL_S
+from src.embeds import error_embed, result_embed
+from src.models.buffered_message import BufferedMessage
+from src.services import channel_buffer, gpt_utils, outbound, prompt_assembly
 
 TOKEN_LIMIT = 200
 OWL_NAME = "Owl 🦉"
+REPLY_TITLE = f"🦉 {OWL_NAME} says"
+log = logging.getLogger("owl.mentions")
 
 def remove_mentions(text: str) -> str:
     text = re.sub(r"<@!?[0-9]+>", "", text)
     return text.strip()
 
+def _to_buffered(message: discord.Message) -> BufferedMessage:
+    return BufferedMessage(message.id, message.author.id, message.author.display_name, message.content or "")
+
 class GptMentions(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    async def _is_excluded_channel(self, guild, channel_id: int) -> bool:
-        s = await get_settings(guild.id)
-        excluded = {s.translation_channel_id, s.voice_channel_id, s.judge_channel_id}
-        return channel_id in excluded
+    async def cog_load(self):
+        # The router only calls us for mentions outside the watcher channels.
+        get_router(self.bot).register_mention_handler(self.handle_mention)
+        prompt_assembly.load_encoding()
+
+    async def cog_unload(self):
+        router = self.bot.get_cog("MessageRouter")
+        if router:
+            router.register_mention_handler(None)
+
+    # ---------------- Channel memory ----------------
+    # Every message in channels where mentions are answered (bots included, so
+    # our own replies count as assistant turns) goes into a ring buffer.
+
+    def _remembers(self, message: discord.Message) -> bool:
+        if message.guild is None:
+            return False
+        return not MENTION_EXCLUDED.intersection(get_router(self.bot).features_for(message.channel.id))
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
-            return
-        if not (message.mentions and any(user.id == self.bot.user.id for user in message.mentions)):
-            return
-        if await self._is_excluded_channel(message.guild, message.channel.id):
-            return
+        if self._remembers(message):
+            channel_buffer.add(message.channel.id, _to_buffered(message))
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        # Raw events fire even for messages that fell out of discord.py's own cache.
+        content = payload.data.get("content")
+        if content is not None:
+            channel_buffer.edit(payload.channel_id, payload.message_id, content)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        channel_buffer.delete(payload.channel_id, payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        for message_id in payload.message_ids:
+            channel_buffer.delete(payload.channel_id, message_id)
 
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        channel_buffer.forget(channel.id)
+
+    async def _memory(self, message: discord.Message) -> List[Tuple[int, Dict[str, str]]]:
+        channel_id = message.channel.id
+        if not channel_buffer.is_warm(channel_id):
+            # Cold buffer (new channel, restart or eviction): one history() call, then live events.
+            older = [_to_buffered(m) async for m in message.channel.history(limit=CHANNEL_BUFFER_SIZE, before=message)]
+            channel_buffer.seed(channel_id, older)
+
+        history = []
+        for msg in channel_buffer.recent(channel_id, before_id=message.id, limit=CHANNEL_BUFFER_SIZE):
+            if msg.content:
+                role = "assistant" if msg.author_id == self.bot.user.id else "user"
+                history.append((msg.id, {"role": role, "content": f"{msg.author_name}: {msg.content.strip()}"}))
+        return history
+
+    async def handle_mention(self, message: discord.Message):
+        started = time.monotonic()
         cleaned = remove_mentions(message.content)
         use_memory = "-" in cleaned
 
-        history = []
-        if use_memory:
-            async for msg in message.channel.history(limit=50, before=message.created_at):
-                if msg.author.bot:
-                    role = "assistant" if msg.author == self.bot.user else "user"
-                else:
-                    role = "user"
-                if msg.content:
-                    history.append({"role": role, "content": f"{msg.author.display_name}: {msg.content.strip()}"})
-            history = list(reversed(history))[-20:]  # keep it short
+        history = await self._memory(message) if use_memory else []
 
         system_prompt = (
             "You are Owl 🦉, a witty but thoughtful assistant in a Discord server. "
@@ -53,18 +102,74 @@ class GptMentions(commands.Cog):
             f"Keep it short, lighthearted, and clever. Under {TOKEN_LIMIT} tokens."
         )
 
-        payload = [{"role": "system", "content": system_prompt}]
-        payload.extend(history)
-        payload.append({"role": "user", "content": cleaned})
+        # Recent history up to MENTION_HISTORY_TOKENS; anything older rides along as a summary.
+        payload = prompt_assembly.assemble(message.channel.id, system_prompt, history, cleaned)
 
-        client = get_client()
-        res = await client.chat.completions.create(
+        if MENTION_STREAMING:
+            await self._reply_streaming(message, payload, started)
+            return
+
+        # Someone is waiting on this reply, so it goes ahead of the watchers.
+        res = await gpt_utils.chat(
+            "mention", gpt_utils.INTERACTIVE,
             model="gpt-4o-mini",
             messages=payload,
             max_tokens=TOKEN_LIMIT,
         )
         reply = res.choices[0].message.content.strip()
-        await message.channel.send(embed=result_embed(f"🦉 {OWL_NAME} says", reply))
+        await outbound.send_embed(message.channel, result_embed(REPLY_TITLE, reply), "mention")
+        log.info(f"Mention reply in #{message.channel}: total {time.monotonic() - started:.2f}s")
+
+    async def _reply_streaming(self, message: discord.Message, payload: List[Dict[str, str]], started: float):
+        """
+        Post a placeholder and edit it as tokens arrive, at most every
+        MENTION_EDIT_INTERVAL_S. Edits run in the background so reading the
+        stream never waits on Discord.
+        """
+        placeholder = await outbound.send_embed(message.channel, result_embed(REPLY_TITLE, "…"), "mention")
+        first_token: Optional[float] = None
+        first_visible: Optional[float] = None
+
+        async def show(embed: discord.Embed, has_text: bool = True):
+            nonlocal first_visible
+            try:
+                await outbound.edit_embeds(placeholder, [embed], "mention")
+            except discord.HTTPException as e:
+                log.debug(f"Progress edit failed: {e}")
+                return
+            if has_text and first_visible is None:
+                first_visible = time.monotonic() - started
+
+        text = ""
+        edit_task: Optional[asyncio.Task] = None
+        last_edit = 0.0
+        try:
+            async for delta in gpt_utils.chat_stream(
+                "mention", gpt_utils.INTERACTIVE,
+                model="gpt-4o-mini",
+                messages=payload,
+                max_tokens=TOKEN_LIMIT,
+            ):
+                if first_token is None:
+                    first_token = time.monotonic() - started
+                text += delta
+                now = time.monotonic()
+                if (edit_task is None or edit_task.done()) and now - last_edit >= MENTION_EDIT_INTERVAL_S:
+                    last_edit = now
+                    edit_task = asyncio.create_task(show(result_embed(REPLY_TITLE, f"{text.strip()} ▌")))
+        except Exception:
+            if edit_task:
+                await edit_task
+            await show(error_embed("Couldn't finish the reply."), has_text=False)
+            raise
+        if edit_task:
+            await edit_task
+        await show(result_embed(REPLY_TITLE, text.strip() or "🤔"))
+
+        log.info(
+            f"Mention reply in #{message.channel}: first token {first_token or 0:.2f}s, "
+            f"first visible {first_visible or 0:.2f}s, total {time.monotonic() - started:.2f}s"
+        )
 
 
 async def setup(bot: commands.Bot):
@@ -0,0 +1,115 @@
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import discord
+from discord.ext import commands
+
+from src.models.guild_settings import GuildSettings
+from src.persistence import guild_settings_store
+
+Handler = Callable[[discord.Message], Awaitable[None]]
+
+# Feature name -> GuildSettings column holding its channel.
+FEATURE_COLUMNS = {
+    "translation": "translation_channel_id",
+    "voice": "voice_channel_id",
+    "judge": "judge_channel_id",
+    "dictionary": "dictionary_channel_id",
+}
+
+# Mentions in these channels belong to the feature, not to GPT replies.
+MENTION_EXCLUDED = {"translation", "voice", "judge"}
+
+log = logging.getLogger("owl.router")
+
+
+class MessageRouter(commands.Cog):
+    """
+    The only on_message listener for channel features.
+    Keeps a channel_id -> features index built from GuildSettings, so a message
+    in an unconfigured channel costs one dict lookup.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._handlers: Dict[str, Handler] = {}
+        self._mention_handler: Optional[Handler] = None
+        self._routes: Dict[int, Tuple[str, ...]] = {}
+        self._guild_channels: Dict[int, Dict[str, int]] = {}
+
+    async def cog_load(self):
+        guild_settings_store.add_listener(self._index_guild)
+
+    async def cog_unload(self):
+        guild_settings_store.remove_listener(self._index_guild)
+
+    # ---------------- Registration ----------------
+
+    def register(self, feature: str, handler: Handler):
+        if feature not in FEATURE_COLUMNS:
+            raise ValueError(f"Unknown feature: {feature}")
+        self._handlers[feature] = handler
+
+    def unregister(self, feature: str):
+        self._handlers.pop(feature, None)
+
+    def register_mention_handler(self, handler: Optional[Handler]):
+        self._mention_handler = handler
+
+    # ---------------- Index ----------------
+
+    def _index_guild(self, settings: GuildSettings):
+        for feature, channel_id in self._guild_channels.pop(settings.guild_id, {}).items():
+            remaining = tuple(f for f in self._routes.get(channel_id, ()) if f != feature)
+            if remaining:
+                self._routes[channel_id] = remaining
+            else:
+                self._routes.pop(channel_id, None)
+
+        channels: Dict[str, int] = {}
+        for feature, column in FEATURE_COLUMNS.items():
+            channel_id = getattr(settings, column)
+            if channel_id:
+                channels[feature] = channel_id
+                self._routes[channel_id] = self._routes.get(channel_id, ()) + (feature,)
+        self._guild_channels[settings.guild_id] = channels
+
+    def features_for(self, channel_id: int) -> Tuple[str, ...]:
+        return self._routes.get(channel_id, ())
+
+    # ---------------- Dispatch ----------------
+
+    async def _run(self, name: str, handler: Handler, message: discord.Message):
+        try:
+            await handler(message)
+        except Exception:
+            log.exception(f"{name} handler failed for message {message.id}")
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.author.bot or not message.guild:
+            return
+        if message.guild.id not in self._guild_channels:
+            self._index_guild(await guild_settings_store.get_settings(message.guild.id))
+
+        features = self._routes.get(message.channel.id, ())
+        for feature in features:
+            handler = self._handlers.get(feature)
+            if handler:
+                await self._run(feature, handler, message)
+
+        if self._mention_handler is None or MENTION_EXCLUDED.intersection(features):
+            return
+        if any(user.id == self.bot.user.id for user in message.mentions):
+            await self._run("mention", self._mention_handler, message)
+
+
+def get_router(bot: commands.Bot) -> MessageRouter:
+    router = bot.get_cog("MessageRouter")
+    if router is None:
+        raise RuntimeError("MessageRouter must be loaded before the watcher cogs.")
+    return router
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(MessageRouter(bot))
@@ -1,9 +1,24 @@
+import io
+
 import discord
 from discord.ext import commands
 
-from src.embeds import info_embed, success_embed, error_embed, settings_embed
-from src.services.definitions import fetch_definition
-from src.services.pronunciation import build_tts, cleanup_file, ACCENT_MAP
+from src.embeds import info_embed, success_embed, error_embed, settings_embed, stats_embed
+from src.services.definitions import definition_stats, fetch_definition
+from src.services.local_lexicon import local_lexicon_stats
+from src.services.pronunciation import build_tts, tts_stats, ACCENT_MAP
+from src.services.transcription import backend_stats
+from src.services.gpt_utils import openai_stats
+from src.services.rating import rating_stats
+from src.services.outbound import outbound_stats
+from src.services.channel_buffer import buffer_stats
+from src.services.prompt_assembly import prompt_stats
+from src.services.whisper_policy import policy_stats
+from src.services.transcription_queue import queue_stats
+from src.services.translation import language_stats, translation_stats
+from src.services.warmup import warmup_stats
+from src.persistence import guild_settings_store
+from src.services import lexicon_cache, singleflight, transcript_cache
 from src.persistence.guild_settings_store import get_settings, upsert_settings, clear_channel
 
 
@@ -23,7 +38,8 @@ class OwlCommands(commands.Cog):
             "`!owl set transcription-channel [#channel|off]`\n"
             "`!owl set judge-channel [#channel|off]`\n"
             "`!owl set dictionary-channel [#channel|off]`\n"
-            "`!owl settings` — Show current server settings"
+            "`!owl settings` — Show current server settings\n"
+            "`!owl stats` — Show cache and queue stats"
         )
         await ctx.send(embed=e)
 
@@ -46,7 +62,7 @@ class OwlCommands(commands.Cog):
             words = f"{accent} {words}".strip()
             accent = "us"
         try:
-            path = build_tts(words, accent)
+            audio, filename = await build_tts(words, accent)
             e = success_embed(
                 "🔊 Pronunciation",
                 fields=[
@@ -54,11 +70,9 @@ class OwlCommands(commands.Cog):
                     ("Accent", accent, True),
                 ],
             )
-            await ctx.send(embed=e, file=discord.File(path, filename=path))
+            await ctx.send(embed=e, file=discord.File(io.BytesIO(audio), filename=filename))
         except Exception:
             await ctx.send(embed=error_embed("Couldn't generate pronunciation."))
-        finally:
-            cleanup_file(path if "path" in locals() else "")
 
     # ---------------- Settings ----------------
     @owl_group.group(name="set")
@@ -137,6 +151,31 @@ class OwlCommands(commands.Cog):
         )
         await ctx.send(embed=e)
 
+    @owl_group.command(name="stats")
+    @commands.has_permissions(manage_guild=True)
+    async def show_stats(self, ctx: commands.Context):
+        sections = [
+            ("Settings cache", guild_settings_store.cache_stats()),
+            ("Lexicon cache", lexicon_cache.cache_stats()),
+            ("Local lexicon", local_lexicon_stats()),
+            ("Definitions", definition_stats()),
+            ("OpenAI", openai_stats()),
+            ("Coalesced calls", singleflight.stats()),
+            ("Pronunciation cache", tts_stats()),
+            ("Language detection", language_stats()),
+            ("Translation", translation_stats()),
+            ("Ratings", rating_stats()),
+            ("Discord API", outbound_stats()),
+            ("Channel memory", buffer_stats()),
+            ("Mention prompts", prompt_stats()),
+            ("Transcription queue", queue_stats()),
+            ("Transcript cache", transcript_cache.cache_stats()),
+            ("Whisper backend", backend_stats()),
+            ("Whisper policy", policy_stats()),
+            ("Models", warmup_stats()),
+        ]
+        await ctx.send(embed=stats_embed(sections))
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(OwlCommands(bot))
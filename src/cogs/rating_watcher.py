@@ -1,8 +1,11 @@
+import asyncio
+
 import discord
 from discord.ext import commands
 
+from src.cogs.message_router import get_router
 from src.embeds import result_embed
-from src.persistence.guild_settings_store import get_settings
+from src.services import outbound
 from src.services.rating import rate_message_and_emojis, digit_to_emoji
 
 
@@ -10,28 +13,30 @@ class RatingWatcher(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
-            return
-        s = await get_settings(message.guild.id)
-        if not s.judge_channel_id or message.channel.id != s.judge_channel_id:
-            return
+    async def cog_load(self):
+        get_router(self.bot).register("judge", self.handle_message)
+
+    async def cog_unload(self):
+        router = self.bot.get_cog("MessageRouter")
+        if router:
+            router.unregister("judge")
+
+    async def handle_message(self, message: discord.Message):
         if not message.content or not message.content.strip():
             return
 
         score, emojis = await rate_message_and_emojis(message.content)
-        digit = digit_to_emoji(score)
-        try:
-            if digit:
-                await message.add_reaction(digit)
-            for e in emojis:
-                await message.add_reaction(e)
-        except discord.Forbidden:
-            pass  # lacking Add Reactions; skip silently
-
-        mini = result_embed("🧮 Owl Rating", f"Score: **{score}** / 9\nEmojis: {' '.join(emojis) if emojis else '—'}")
-        await message.channel.send(embed=mini)
+        mini = result_embed(
+            "🧮 Owl Rating",
+            f"Score: **{score}** / 9\nEmojis: {' '.join(emojis) if emojis else '—'}",
+            footer=f"Message by {message.author.display_name}",  # ratings in a burst share one message
+        )
+        # Reactions and the reply use different rate-limit buckets, so they go out side by side.
+        # The score digit is added first so it stays the leftmost reaction.
+        await asyncio.gather(
+            outbound.add_reactions(message, [digit_to_emoji(score), *emojis], "rating"),
+            outbound.post_embed(message.channel, mini, "rating"),
+        )
 
 
 async def setup(bot: commands.Bot):
@@ -1,35 +1,45 @@
 import discord
 from discord.ext import commands
 
+from src.cogs.message_router import get_router
 from src.embeds import result_embed
-from src.persistence.guild_settings_store import get_settings
-from src.services.translation import detect_language, translate_to_english, get_flag, clean_mentions
+from src.services import outbound
+from src.services.translation import (
+    clean_mentions,
+    detect_language,
+    get_flag,
+    should_translate,
+    translate_to_english,
+)
 
 
 class TranslationWatcher(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
-            return
-        s = await get_settings(message.guild.id)
-        if not s.translation_channel_id or message.channel.id != s.translation_channel_id:
-            return
+    async def cog_load(self):
+        get_router(self.bot).register("translation", self.handle_message)
 
+    async def cog_unload(self):
+        router = self.bot.get_cog("MessageRouter")
+        if router:
+            router.unregister("translation")
+
+    async def handle_message(self, message: discord.Message):
         cleaned = clean_mentions(message.content)
         if not cleaned.strip():
             return
 
-        lang, conf = detect_language(cleaned)
+        lang, conf = await detect_language(cleaned)
+        if not should_translate(lang, conf):
+            return
         translated = await translate_to_english(cleaned)
         src_flag = get_flag(lang)
         dst_flag = get_flag("en")
         e = result_embed("🌐 Translation",
                          f"{src_flag} → {dst_flag}\n\n> {translated}",
                          footer=f"Requested by {message.author.display_name} • Confidence {conf:.2f}")
-        await message.channel.send(embed=e)
+        await outbound.post_embed(message.channel, e, "translation")
 
 
 async def setup(bot: commands.Bot):
@@ -1,10 +1,33 @@
-import os
+import logging
+import time
+from typing import List, Optional
+
 import discord
 from discord.ext import commands
 
-from src.embeds import result_embed, error_embed
-from src.persistence.guild_settings_store import get_settings
-from src.services.transcription import download_file, transcribe_file, cleanup
+from src.cogs.message_router import get_router
+from src.config import TRANSCRIBE_EDIT_INTERVAL_S
+from src.embeds import info_embed, result_embed, error_embed
+from src.models.transcript import Segment, Transcript
+from src.services import outbound, transcript_cache
+from src.services.transcription import (
+    MAX_DOWNLOAD_BYTES,
+    DownloadTooLarge,
+    NoSpeechDetected,
+    WindowResult,
+    build_transcript,
+    cleanup,
+    download_file,
+    scratch_path,
+    shutdown,
+    transcribe_windows,
+)
+from src.services.transcription_queue import QueueFull, get_scheduler
+
+log = logging.getLogger("owl.voice")
+
+# Three pages fit in one message under Discord's 6000-character total for embeds.
+_PAGE_LIMIT = 1900
 
 
 def is_audio_like(attachment: discord.Attachment) -> bool:
@@ -24,38 +47,175 @@ def is_audio_like(attachment: discord.Attachment) -> bool:
     return any(name.endswith(ext) for ext in exts)
 
 
+def _fmt_ts(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+def _render_pages(segments: List[Segment], text: str = "") -> List[str]:
+    """Timestamped lines packed into embed-sized pages (plain text if there are no segments)."""
+    if segments:
+        lines = [f"`[{_fmt_ts(seg.start)}]` {seg.text}"[:_PAGE_LIMIT] for seg in segments]
+    else:
+        lines = [text[i:i + _PAGE_LIMIT] for i in range(0, len(text), _PAGE_LIMIT)]
+    pages: List[str] = []
+    current = ""
+    for line in lines:
+        if current and len(current) + 1 + len(line) > _PAGE_LIMIT:
+            pages.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        pages.append(current)
+    return pages
+
+
+class _ProgressiveReply:
+    """
+    The transcript as page embeds packed several to a message, edited in
+    place (at most every TRANSCRIBE_EDIT_INTERVAL_S) as windows finish.
+    Only messages whose pages changed are edited.
+    """
+
+    def __init__(self, channel: discord.abc.Messageable):
+        self.channel = channel
+        self.messages: List[discord.Message] = []
+        self._shown: List[List[dict]] = []
+        self._last_edit = 0.0
+        self._streamed = False
+
+    async def start(self, filename: str):
+        embed = info_embed("📜 Transcribing…", f"`{filename}`")
+        self.messages.append(await outbound.send_embed(self.channel, embed, "transcription"))
+        self._shown.append([embed.to_dict()])
+        self._last_edit = time.monotonic()
+
+    async def render(self, pages: List[str], footer: str, final: bool = False):
+        now = time.monotonic()
+        if not final and now - self._last_edit < TRANSCRIBE_EDIT_INTERVAL_S:
+            return
+        self._last_edit = now
+        has_text = bool(pages)
+        pages = pages or ["…"]
+        embeds = [
+            result_embed(
+                "📜 Transcription" if idx == 0 else "📜 Transcription (cont.)",
+                page,
+                footer=footer if idx == len(pages) - 1 else None,
+            )
+            for idx, page in enumerate(pages)
+        ]
+        try:
+            for idx, group in enumerate(outbound.pack_embeds(embeds)):
+                shown = [embed.to_dict() for embed in group]
+                if idx < len(self._shown) and self._shown[idx] == shown:
+                    continue
+                if idx < len(self.messages):
+                    await outbound.edit_embeds(self.messages[idx], group, "transcription")
+                    self._shown[idx] = shown
+                else:
+                    sent = await outbound.send_embeds(self.channel, group, "transcription", count_event=False)
+                    self.messages.append(sent[0])
+                    self._shown.append(shown)
+                self._streamed = self._streamed or has_text
+        except discord.HTTPException as e:
+            # A missed progress update must not cost the transcription itself.
+            if final:
+                raise
+            log.debug(f"Progress edit failed: {e}")
+
+    async def fail(self, embed: discord.Embed):
+        # Keep whatever transcript was already streamed; only the placeholder is replaced.
+        if self.messages and not self._streamed:
+            await outbound.edit_embeds(self.messages[-1], [embed], "transcription")
+        else:
+            await outbound.send_embed(self.channel, embed, "transcription")
+
+
 class VoiceWatcher(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
-            return
-        s = await get_settings(message.guild.id)
-        if not s.voice_channel_id or message.channel.id != s.voice_channel_id:
-            return
+    async def cog_load(self):
+        get_router(self.bot).register("voice", self.handle_message)
+
+    async def cog_unload(self):
+        router = self.bot.get_cog("MessageRouter")
+        if router:
+            router.unregister("voice")
+        await get_scheduler().stop()
+        shutdown()
+
+    async def handle_message(self, message: discord.Message):
         if not message.attachments:
             return
 
+        scheduler = get_scheduler()
         for att in message.attachments:
-            if is_audio_like(att):
-                temp = f"tmp_{att.filename}"
-                try:
-                    await download_file(att.url, temp)
-                    text = await transcribe_file(temp)
-                    if not text.strip():
-                        await message.channel.send(embed=error_embed("Transcription failed or empty."))
-                        continue
-                    chunks = [text[i:i + 1800] for i in range(0, len(text), 1800)]
-                    for idx, chunk in enumerate(chunks, 1):
-                        title = "📜 Transcription" if len(chunks) == 1 else f"📜 Transcription ({idx}/{len(chunks)})"
-                        await message.channel.send(embed=result_embed(title, f"> {chunk}"))
-                except Exception:
-                    await message.channel.send(embed=error_embed("Couldn't transcribe the audio."))
-                finally:
-                    cleanup(temp)
+            if not is_audio_like(att):
+                continue
+            if att.size > MAX_DOWNLOAD_BYTES:
+                await outbound.send_embed(message.channel, error_embed(
+                    "File too large to transcribe.",
+                    f"`{att.filename}` is {att.size / 1048576:.0f} MB; the limit is {MAX_DOWNLOAD_BYTES / 1048576:.0f} MB.",
+                ), "transcription")
+                continue
+            try:
+                position = scheduler.submit(message.guild.id, lambda att=att: self._transcribe(message, att))
+            except QueueFull:
+                await outbound.send_embed(
+                    message.channel,
+                    error_embed("Transcription queue is full.", "Please try again in a few minutes."),
+                    "transcription",
+                )
+                continue
+            if position:
+                await outbound.send_embed(
+                    message.channel,
+                    info_embed("⏳ Queued", f"`{att.filename}` is queued for transcription, position {position}."),
+                    "transcription",
+                )
+
+    async def _transcribe(self, message: discord.Message, att: discord.Attachment):
+        temp = scratch_path(att.filename)
+        reply = _ProgressiveReply(message.channel)
+        try:
+            _, sha256 = await download_file(att.url, temp)
+            # Re-posted audio: answer from the cache without loading Whisper.
+            transcript = await transcript_cache.get(sha256)
+            if transcript is None:
+                transcript = await self._transcribe_progressively(temp, att.filename, reply)
+                if transcript.text.strip():
+                    await transcript_cache.put(sha256, transcript)
+            if not transcript.text.strip():
+                await reply.fail(error_embed("Transcription failed or empty."))
+                return
+            footer = f"Language: {transcript.language or '?'} • Model: {transcript.model}"
+            await reply.render(_render_pages(transcript.segments, transcript.text), footer, final=True)
+        except DownloadTooLarge:
+            await reply.fail(error_embed("File too large to transcribe."))
+        except NoSpeechDetected:
+            await reply.fail(error_embed("No speech detected.", "The recording seems to be silence or background noise."))
+        except Exception:
+            log.exception(f"Transcription of {att.filename!r} failed")
+            await reply.fail(error_embed("Couldn't transcribe the audio."))
+        finally:
+            cleanup(temp)
 
+    async def _transcribe_progressively(self, path: str, filename: str, reply: _ProgressiveReply) -> Transcript:
+        await reply.start(filename)
+        segments: List[Segment] = []
+        last: Optional[WindowResult] = None
+        async for last in transcribe_windows(path, queue_depth=get_scheduler().depth):
+            segments.extend(last.segments)
+            await reply.render(
+                _render_pages(segments),
+                f"Transcribing… {_fmt_ts(last.done_s)} / {_fmt_ts(last.total_s)} • Model: {last.model}"
+                + (f" • {last.trimmed_s:.0f}s of silence skipped" if last.trimmed_s >= 1 else ""),
+            )
+        return build_transcript(segments, last.language, last.model)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(VoiceWatcher(bot))
@@ -19,10 +19,92 @@ OWL_INTENTS = discord.Intents(
     typing=False,
 )
 
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
 DISCORD_TOKEN = ""
 OPENAI_API_KEY = ""
 FASTTEXT_MODEL_PATH = os.getenv("FASTTEXT_MODEL_PATH", "models/lid.176.bin")
 WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "cpu")
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+# "thread" runs Whisper inside the bot process; "process" uses a pool of worker processes
+WHISPER_BACKEND = os.getenv("WHISPER_BACKEND", "thread").strip().lower()
+WHISPER_PROCESSES = int(os.getenv("WHISPER_PROCESSES", "1"))
+# Adaptive model choice: WHISPER_MODEL is the best quality used; drop towards
+# WHISPER_FAST_MODEL when the estimated time would blow the latency budget or the queue is deep
+WHISPER_ADAPTIVE = _env_flag("WHISPER_ADAPTIVE", True)
+WHISPER_FAST_MODEL = os.getenv("WHISPER_FAST_MODEL", "tiny")
+WHISPER_LATENCY_BUDGET_S = float(os.getenv("WHISPER_LATENCY_BUDGET_S", "60"))
+WHISPER_BUSY_QUEUE_DEPTH = int(os.getenv("WHISPER_BUSY_QUEUE_DEPTH", "5"))
+# Unload Whisper models (or stop the worker processes) after this long unused; 0 keeps them forever
+WHISPER_IDLE_UNLOAD_S = float(os.getenv("WHISPER_IDLE_UNLOAD_S", "900"))
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", "1"))
+TRANSCRIBE_QUEUE_MAX = int(os.getenv("TRANSCRIBE_QUEUE_MAX", "20"))
+# Audio is transcribed in windows of this many seconds; the reply is edited as each one finishes
+TRANSCRIBE_WINDOW_S = float(os.getenv("TRANSCRIBE_WINDOW_S", "30"))
+TRANSCRIBE_EDIT_INTERVAL_S = float(os.getenv("TRANSCRIBE_EDIT_INTERVAL_S", "1.5"))
+# Energy-based voice activity detection: only speech regions are sent to Whisper
+VAD_ENABLED = _env_flag("VAD_ENABLED", True)
+VAD_MIN_DB = float(os.getenv("VAD_MIN_DB", "-50"))
+VAD_MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", "10"))
+TRANSCRIBE_MAX_MB = float(os.getenv("TRANSCRIBE_MAX_MB", "100"))
+SCRATCH_DIR = os.getenv("SCRATCH_DIR", "data/tmp")
+TRANSCRIPT_CACHE_MAX_ROWS = int(os.getenv("TRANSCRIPT_CACHE_MAX_ROWS", "5000"))
+TRANSCRIPT_CACHE_TTL = float(os.getenv("TRANSCRIPT_CACHE_TTL", str(90 * 24 * 3600)))
+DB_READERS = int(os.getenv("DB_READERS", "2"))
+
+# GPT mentions: stream the reply into a placeholder, editing it at most this often
+MENTION_STREAMING = _env_flag("MENTION_STREAMING", False)
+MENTION_EDIT_INTERVAL_S = float(os.getenv("MENTION_EDIT_INTERVAL_S", "1.0"))
+
+# GPT memory mode: verbatim history is trimmed to this many tokens; older messages are
+# carried as a rolling per-channel summary of at most MENTION_SUMMARY_TOKENS
+MENTION_HISTORY_TOKENS = int(os.getenv("MENTION_HISTORY_TOKENS", "600"))
+MENTION_SUMMARY_TOKENS = int(os.getenv("MENTION_SUMMARY_TOKENS", "150"))
+
+# GPT memory mode: recent messages kept per channel, and across all channels
+CHANNEL_BUFFER_SIZE = int(os.getenv("CHANNEL_BUFFER_SIZE", "50"))
+CHANNEL_BUFFER_MAX_MESSAGES = int(os.getenv("CHANNEL_BUFFER_MAX_MESSAGES", "20000"))
+
+# OpenAI limits shared by every feature (set them a little under your account's limits)
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "200000"))
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "4"))
+
+# Models to preload in the background at startup (comma-separated: fasttext, whisper)
+WARMUP_MODELS = [m.strip() for m in os.getenv("WARMUP_MODELS", "fasttext").split(",") if m.strip()]
+
+# fastText language detection: micro-batch window and recent-result cache
+LANGID_BATCH_WINDOW_MS = float(os.getenv("LANGID_BATCH_WINDOW_MS", "5"))
+LANGID_BATCH_MAX = int(os.getenv("LANGID_BATCH_MAX", "32"))
+LANGID_CACHE_SIZE = int(os.getenv("LANGID_CACHE_SIZE", "5000"))
+
+# Translation channel: skip the LLM for confidently-English text, cache repeats
+TRANSLATION_SKIP_ENGLISH = _env_flag("TRANSLATION_SKIP_ENGLISH", True)
+TRANSLATION_SKIP_CONFIDENCE = float(os.getenv("TRANSLATION_SKIP_CONFIDENCE", "0.85"))
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "2000"))
+
+# Judge channel: rate bursts of messages together in one JSON completion
+RATING_BATCH_ENABLED = _env_flag("RATING_BATCH_ENABLED", False)
+RATING_BATCH_WINDOW_S = float(os.getenv("RATING_BATCH_WINDOW_S", "2"))
+RATING_BATCH_MAX = int(os.getenv("RATING_BATCH_MAX", "10"))
+
+# Pronunciation MP3 cache (content-addressed files, LRU by byte budget)
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "data/tts")
+TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", "200"))
+
+# Definitions / glossary cache: in-memory LRU in front of a SQLite table
+LEXICON_CACHE_SIZE = int(os.getenv("LEXICON_CACHE_SIZE", "2000"))
+LEXICON_CACHE_TTL = float(os.getenv("LEXICON_CACHE_TTL", str(30 * 24 * 3600)))
+LEXICON_CACHE_MAX_ROWS = int(os.getenv("LEXICON_CACHE_MAX_ROWS", "50000"))
+# Compiled offline dictionary (python -m src.services.local_lexicon build ...); used if the file exists
+LOCAL_LEXICON_PATH = os.getenv("LOCAL_LEXICON_PATH", "data/lexicon.idx")
+# Race a one-liner against dictionary lookups slower than this percentile of recent ones (0 disables)
+LEXICON_HEDGE_PERCENTILE = float(os.getenv("LEXICON_HEDGE_PERCENTILE", "95"))
 
 def load_env():
     load_dotenv(override=False)
@@ -1,5 +1,5 @@
 import discord
-from typing import Iterable, Optional, Tuple
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 OWL_COLOR_INFO = discord.Color.blue()
 OWL_COLOR_SUCCESS = discord.Color.teal()
@@ -40,3 +40,10 @@ def settings_embed(guild_name: str, translation_ch: str, voice_ch: str, judge_ch
     e.add_field(name="Judge Channel", value=judge_ch or "—", inline=False)
     e.add_field(name="Dictionary Channel", value=dictionary_ch or "—", inline=False)
     return e
+
+def stats_embed(sections: Iterable[Tuple[str, Dict[str, Any]]]) -> discord.Embed:
+    e = base_embed("📊 Owl Stats", color=OWL_COLOR_INFO)
+    for name, values in sections:
+        lines = [f"**{k}:** {v:.2f}" if isinstance(v, float) else f"**{k}:** {v}" for k, v in values.items()]
+        e.add_field(name=name, value="\n".join(lines)[:1024] or "—", inline=True)
+    return e
@@ -1 +1 @@
-__all__ = ["guild_settings"]
\ No newline at end of file
+__all__ = ["buffered_message", "guild_settings", "transcript"]
\ No newline at end of file
@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+
+@dataclass
+class BufferedMessage:
+    id: int
+    author_id: int
+    author_name: str
+    content: str
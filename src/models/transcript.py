@@ -0,0 +1,15 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+@dataclass
+class Segment:
+    start: float
+    end: float
+    text: str
+
+@dataclass
+class Transcript:
+    text: str
+    model: str
+    language: Optional[str] = None
+    segments: List[Segment] = field(default_factory=list)
@@ -1,11 +1,116 @@
-import aiosqlite
+import asyncio
 import logging
+import os
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import aiosqlite
+
+from src.config import DB_READERS
 
 _DB_PATH = "data/owl.sqlite3"
 
+# Applied to every pooled connection. WAL lets the readers run alongside the writer.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+)
+# sqlite3 keeps prepared statements per connection, keyed by SQL text;
+# long-lived connections make that cache actually pay off.
+_STATEMENT_CACHE = 256
+
+
+async def _connect(path: str) -> aiosqlite.Connection:
+    conn = await aiosqlite.connect(path, cached_statements=_STATEMENT_CACHE)
+    for pragma in _PRAGMAS:
+        await conn.execute(pragma)
+    return conn
+
+
+class _Pool:
+    """One shared writer plus a few readers, all opened once for the app's lifetime."""
+
+    def __init__(self, path: str, readers: int):
+        self.path = path
+        self.size = max(1, readers)
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle: asyncio.Queue = asyncio.Queue()
+
+    async def open(self):
+        # Open the writer first so journal_mode=WAL is in place before the readers attach.
+        self._writer = await _connect(self.path)
+        for _ in range(self.size):
+            conn = await _connect(self.path)
+            self._readers.append(conn)
+            self._idle.put_nowait(conn)
+
+    @asynccontextmanager
+    async def reader(self):
+        conn = await self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put_nowait(conn)
+
+    @asynccontextmanager
+    async def writer(self):
+        async with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                # Don't leak a half-done transaction into the next writer.
+                await self._writer.rollback()
+                raise
+
+    async def close(self):
+        async with self._write_lock:
+            for conn in [self._writer, *self._readers]:
+                if conn is not None:
+                    await conn.close()
+            self._writer = None
+            self._readers.clear()
+
+
+_POOL: Optional[_Pool] = None
+
+
+async def open_db(readers: int = DB_READERS):
+    global _POOL
+    if _POOL is not None:
+        return
+    os.makedirs(os.path.dirname(_DB_PATH) or ".", exist_ok=True)
+    pool = _Pool(_DB_PATH, readers)
+    await pool.open()
+    _POOL = pool
+    logging.getLogger("owl.db").info(f"Opened SQLite pool ({pool.size} readers + 1 writer) at {_DB_PATH}")
+
+
+async def close_db():
+    global _POOL
+    pool, _POOL = _POOL, None
+    if pool is not None:
+        await pool.close()
+        logging.getLogger("owl.db").info("Closed SQLite pool")
+
+
 def get_db():
-    # Return the connection context manager (unawaited)
-    return aiosqlite.connect(_DB_PATH)
+    # Read connection context manager. Falls back to a one-off connection
+    # when the pool isn't open (scripts, benchmarks).
+    if _POOL is None:
+        return aiosqlite.connect(_DB_PATH)
+    return _POOL.reader()
+
+
+def get_write_db():
+    # Shared writer, held exclusively for the duration of the block.
+    if _POOL is None:
+        return aiosqlite.connect(_DB_PATH)
+    return _POOL.writer()
 
 async def _ensure_column(db, table: str, column: str, ddl: str):
     # Add column if it doesn't exist
@@ -15,7 +120,7 @@ async def _ensure_column(db, table: str, column: str, ddl: str):
         await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
 
 async def init_db():
-    async with get_db() as db:
+    async with get_write_db() as db:
         # base table
         await db.execute(
             """
@@ -30,5 +135,34 @@ async def init_db():
         )
         # migrations
         await _ensure_column(db, "guild_settings", "dictionary_channel_id", "INTEGER NULL")
+        # lexicon cache (definitions / glossary results keyed by normalized word)
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lexicon_cache (
+                word TEXT PRIMARY KEY,
+                max_entries INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_lexicon_cache_last_used ON lexicon_cache(last_used)")
+        # transcript cache (keyed by SHA-256 of the downloaded audio)
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS transcript_cache (
+                sha256 TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                language TEXT NULL,
+                text TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_transcript_cache_last_used ON transcript_cache(last_used)")
+        await _ensure_column(db, "transcript_cache", "segments", "TEXT NULL")
         await db.commit()
     logging.getLogger("owl.db").info("Database initialized")
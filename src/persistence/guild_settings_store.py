@@ -1,9 +1,39 @@
-from typing import Optional
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional
 
-from .db import get_db
+from .db import get_db, get_write_db
 from src.models.guild_settings import GuildSettings
 
-async def get_settings(guild_id: int) -> GuildSettings:
+# Per-process write-through cache. Every on_message listener looks settings up,
+# so ordinary chat should never have to touch SQLite.
+_CACHE: Dict[int, GuildSettings] = {}
+_STATS = {"hits": 0, "misses": 0}
+# Called with the new settings after every successful write (e.g. the message router's index).
+_LISTENERS: List[Callable[[GuildSettings], None]] = []
+
+
+def cache_stats() -> Dict[str, int]:
+    return {**_STATS, "size": len(_CACHE)}
+
+
+def add_listener(callback: Callable[[GuildSettings], None]) -> None:
+    if callback not in _LISTENERS:
+        _LISTENERS.append(callback)
+
+
+def remove_listener(callback: Callable[[GuildSettings], None]) -> None:
+    if callback in _LISTENERS:
+        _LISTENERS.remove(callback)
+
+
+def invalidate(guild_id: Optional[int] = None) -> None:
+    if guild_id is None:
+        _CACHE.clear()
+    else:
+        _CACHE.pop(guild_id, None)
+
+
+async def _fetch_settings(guild_id: int) -> GuildSettings:
     async with get_db() as db:
         async with db.execute(
             "SELECT guild_id, translation_channel_id, voice_channel_id, judge_channel_id, dictionary_channel_id "
@@ -21,6 +51,49 @@ async def get_settings(guild_id: int) -> GuildSettings:
                 dictionary_channel_id=row[4],
             )
 
+async def _write_settings(settings: GuildSettings) -> None:
+    try:
+        async with get_write_db() as db:
+            await db.execute(
+                """
+                INSERT INTO guild_settings (guild_id, translation_channel_id, voice_channel_id, judge_channel_id, dictionary_channel_id)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET
+                  translation_channel_id=excluded.translation_channel_id,
+                  voice_channel_id=excluded.voice_channel_id,
+                  judge_channel_id=excluded.judge_channel_id,
+                  dictionary_channel_id=excluded.dictionary_channel_id,
+                  updated_at=datetime('now')
+                """,
+                (
+                    settings.guild_id,
+                    settings.translation_channel_id,
+                    settings.voice_channel_id,
+                    settings.judge_channel_id,
+                    settings.dictionary_channel_id,
+                ),
+            )
+            await db.commit()
+    except Exception:
+        # Don't keep serving a row we failed to persist.
+        invalidate(settings.guild_id)
+        raise
+    _CACHE[settings.guild_id] = replace(settings)
+    for callback in list(_LISTENERS):
+        callback(replace(settings))
+
+async def get_settings(guild_id: int) -> GuildSettings:
+    cached = _CACHE.get(guild_id)
+    if cached is not None:
+        _STATS["hits"] += 1
+    else:
+        _STATS["misses"] += 1
+        cached = await _fetch_settings(guild_id)
+        # A write may have landed while we were reading; it wins.
+        cached = _CACHE.setdefault(guild_id, cached)
+    # Hand out a copy so callers can't mutate the cached instance.
+    return replace(cached)
+
 async def upsert_settings(
     guild_id: int,
     translation_channel_id: Optional[int] = None,
@@ -38,27 +111,7 @@ async def upsert_settings(
     if dictionary_channel_id is not None:
         existing.dictionary_channel_id = dictionary_channel_id
 
-    async with get_db() as db:
-        await db.execute(
-            """
-            INSERT INTO guild_settings (guild_id, translation_channel_id, voice_channel_id, judge_channel_id, dictionary_channel_id)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(guild_id) DO UPDATE SET
-              translation_channel_id=excluded.translation_channel_id,
-              voice_channel_id=excluded.voice_channel_id,
-              judge_channel_id=excluded.judge_channel_id,
-              dictionary_channel_id=excluded.dictionary_channel_id,
-              updated_at=datetime('now')
-            """,
-            (
-                existing.guild_id,
-                existing.translation_channel_id,
-                existing.voice_channel_id,
-                existing.judge_channel_id,
-                existing.dictionary_channel_id,
-            ),
-        )
-        await db.commit()
+    await _write_settings(existing)
     return existing
 
 async def clear_channel(guild_id: int, which: str) -> GuildSettings:
@@ -72,10 +125,6 @@ async def clear_channel(guild_id: int, which: str) -> GuildSettings:
     elif which == "dictionary":
         settings.dictionary_channel_id = None
 
-    return await upsert_settings(
-        guild_id,
-        translation_channel_id=settings.translation_channel_id,
-        voice_channel_id=settings.voice_channel_id,
-        judge_channel_id=settings.judge_channel_id,
-        dictionary_channel_id=settings.dictionary_channel_id,
-    )
+    # upsert_settings treats None as "leave unchanged", so write the cleared row directly.
+    await _write_settings(settings)
+    return settings
@@ -0,0 +1,63 @@
+import json
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .db import get_db, get_write_db
+
+
+async def get_lexicon(word: str) -> Optional[Tuple[int, Dict[str, Any], float]]:
+    """Return (max_entries, data, created_at) for a normalized word, or None."""
+    async with get_db() as db:
+        async with db.execute(
+            "SELECT max_entries, data, created_at FROM lexicon_cache WHERE word = ?",
+            (word,),
+        ) as cur:
+            row = await cur.fetchone()
+    if not row:
+        return None
+    return row[0], json.loads(row[1]), row[2]
+
+async def touch_lexicon(word: str) -> None:
+    async with get_write_db() as db:
+        await db.execute("UPDATE lexicon_cache SET last_used = ? WHERE word = ?", (time.time(), word))
+        await db.commit()
+
+async def touch_lexicons(words: Iterable[str]) -> None:
+    now = time.time()
+    async with get_write_db() as db:
+        await db.executemany("UPDATE lexicon_cache SET last_used = ? WHERE word = ?", [(now, w) for w in words])
+        await db.commit()
+
+async def put_lexicon(word: str, max_entries: int, data: Dict[str, Any]) -> None:
+    now = time.time()
+    async with get_write_db() as db:
+        await db.execute(
+            """
+            INSERT INTO lexicon_cache (word, max_entries, data, created_at, last_used)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(word) DO UPDATE SET
+              max_entries=excluded.max_entries,
+              data=excluded.data,
+              created_at=excluded.created_at,
+              last_used=excluded.last_used
+            """,
+            (word, max_entries, json.dumps(data, ensure_ascii=False), now, now),
+        )
+        await db.commit()
+
+async def evict_lexicon(max_age: float, max_rows: int) -> int:
+    """Drop rows older than max_age seconds, then the least recently used beyond max_rows."""
+    async with get_write_db() as db:
+        cur = await db.execute("DELETE FROM lexicon_cache WHERE created_at < ?", (time.time() - max_age,))
+        removed = cur.rowcount
+        cur = await db.execute(
+            """
+            DELETE FROM lexicon_cache WHERE word IN (
+              SELECT word FROM lexicon_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (max_rows,),
+        )
+        removed += cur.rowcount
+        await db.commit()
+    return removed
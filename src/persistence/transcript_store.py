@@ -0,0 +1,72 @@
+import json
+import time
+from typing import Optional
+
+from .db import get_db, get_write_db
+from src.models.transcript import Segment, Transcript
+
+
+async def get_transcript(sha256: str, max_age: float) -> Optional[Transcript]:
+    """The cached transcript for `sha256`, or None if there is none younger than max_age seconds."""
+    async with get_db() as db:
+        async with db.execute(
+            "SELECT text, model, language, segments FROM transcript_cache WHERE sha256 = ? AND created_at >= ?",
+            (sha256, time.time() - max_age),
+        ) as cur:
+            row = await cur.fetchone()
+    if not row:
+        return None
+    segments = [Segment(*seg) for seg in json.loads(row[3])] if row[3] else []
+    return Transcript(text=row[0], model=row[1], language=row[2], segments=segments)
+
+async def touch_transcript(sha256: str) -> None:
+    async with get_write_db() as db:
+        await db.execute(
+            "UPDATE transcript_cache SET last_used = ?, hits = hits + 1 WHERE sha256 = ?",
+            (time.time(), sha256),
+        )
+        await db.commit()
+
+async def put_transcript(sha256: str, transcript: Transcript) -> None:
+    now = time.time()
+    async with get_write_db() as db:
+        await db.execute(
+            """
+            INSERT INTO transcript_cache (sha256, model, language, text, segments, created_at, last_used)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(sha256) DO UPDATE SET
+              model=excluded.model,
+              language=excluded.language,
+              text=excluded.text,
+              segments=excluded.segments,
+              created_at=excluded.created_at,
+              last_used=excluded.last_used
+            """,
+            (
+                sha256,
+                transcript.model,
+                transcript.language,
+                transcript.text,
+                json.dumps([[seg.start, seg.end, seg.text] for seg in transcript.segments], ensure_ascii=False),
+                now,
+                now,
+            ),
+        )
+        await db.commit()
+
+async def evict_transcripts(max_age: float, max_rows: int) -> int:
+    """Drop rows older than max_age seconds, then the least recently used beyond max_rows."""
+    async with get_write_db() as db:
+        cur = await db.execute("DELETE FROM transcript_cache WHERE created_at < ?", (time.time() - max_age,))
+        removed = cur.rowcount
+        cur = await db.execute(
+            """
+            DELETE FROM transcript_cache WHERE sha256 IN (
+              SELECT sha256 FROM transcript_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (max_rows,),
+        )
+        removed += cur.rowcount
+        await db.commit()
+    return removed
@@ -0,0 +1,89 @@
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, List
+
+from src.config import CHANNEL_BUFFER_SIZE, CHANNEL_BUFFER_MAX_MESSAGES
+from src.models.buffered_message import BufferedMessage
+
+# channel_id -> recent messages, oldest first; channels in least-recently-active order.
+# Fed from gateway events so GPT memory mode doesn't need a history() call per mention.
+_CHANNELS: "OrderedDict[int, Deque[BufferedMessage]]" = OrderedDict()
+# Channels whose buffer holds everything before the newest message (seeded from
+# history() or filled up from live traffic); others only know what arrived since startup.
+_WARM: set = set()
+_TOTAL = 0
+_STATS = {"reads": 0, "history_fetches": 0, "evicted_channels": 0}
+
+
+def _evict():
+    global _TOTAL
+    while _TOTAL > CHANNEL_BUFFER_MAX_MESSAGES and _CHANNELS:
+        channel_id, messages = _CHANNELS.popitem(last=False)
+        _WARM.discard(channel_id)
+        _TOTAL -= len(messages)
+        _STATS["evicted_channels"] += 1
+
+def add(channel_id: int, message: BufferedMessage):
+    global _TOTAL
+    messages = _CHANNELS.get(channel_id)
+    if messages is None:
+        messages = _CHANNELS[channel_id] = deque(maxlen=CHANNEL_BUFFER_SIZE)
+    else:
+        _CHANNELS.move_to_end(channel_id)
+    if len(messages) == messages.maxlen:
+        _TOTAL -= 1
+    messages.append(message)
+    _TOTAL += 1
+    if len(messages) == messages.maxlen:
+        _WARM.add(channel_id)
+    _evict()
+
+def edit(channel_id: int, message_id: int, content: str):
+    for message in _CHANNELS.get(channel_id, ()):
+        if message.id == message_id:
+            message.content = content
+            return
+
+def delete(channel_id: int, message_id: int):
+    global _TOTAL
+    messages = _CHANNELS.get(channel_id)
+    if not messages:
+        return
+    for message in messages:
+        if message.id == message_id:
+            messages.remove(message)
+            _TOTAL -= 1
+            return
+
+def forget(channel_id: int):
+    global _TOTAL
+    messages = _CHANNELS.pop(channel_id, None)
+    _WARM.discard(channel_id)
+    if messages:
+        _TOTAL -= len(messages)
+
+def is_warm(channel_id: int) -> bool:
+    return channel_id in _WARM
+
+def seed(channel_id: int, older: Iterable[BufferedMessage]):
+    """Merge messages fetched with history() under what the gateway already delivered."""
+    global _TOTAL
+    existing = _CHANNELS.pop(channel_id, deque())
+    _TOTAL -= len(existing)
+    merged = {m.id: m for m in older}
+    merged.update((m.id, m) for m in existing)  # live copies carry the latest edits
+    messages = deque(sorted(merged.values(), key=lambda m: m.id), maxlen=CHANNEL_BUFFER_SIZE)
+    _CHANNELS[channel_id] = messages
+    _TOTAL += len(messages)
+    _WARM.add(channel_id)
+    _STATS["history_fetches"] += 1
+    _evict()
+
+def recent(channel_id: int, before_id: int, limit: int) -> List[BufferedMessage]:
+    """Up to `limit` newest buffered messages older than `before_id`, oldest first."""
+    _STATS["reads"] += 1
+    # Snowflake ids increase with time, so id order is chronological order.
+    older = [m for m in _CHANNELS.get(channel_id, ()) if m.id < before_id]
+    return older[-limit:] if limit else []
+
+def buffer_stats() -> Dict[str, Any]:
+    return {"channels": len(_CHANNELS), "warm_channels": len(_WARM), "messages": _TOTAL, **_STATS}
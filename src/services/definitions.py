@@ -1,10 +1,18 @@
 # owl/services/definitions.py
+import asyncio
 import json
 import re
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
 
+import discord
+
+from src.config import LEXICON_HEDGE_PERCENTILE
 from src.embeds import base_embed, result_embed, error_embed
-from src.services.gpt_utils import get_client
+from src.services import lexicon_cache, local_lexicon
+from src.services import gpt_utils
+from src.services.singleflight import SingleFlight
 
 # ---------------- LLM prompts ----------------
 
@@ -22,6 +30,80 @@ _JSON_INSTRUCTIONS = (
     "No markdown, no commentary—JSON only."
 )
 
+# Structured output: the API guarantees this shape, so there is no retry pass.
+_ENTRY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "pos": {"type": "string"},
+        "meaning": {"type": "string"},
+        "synonyms": {"type": "array", "items": {"type": "string"}},
+        "antonyms": {"type": "array", "items": {"type": "string"}},
+        "example": {"type": "string"},
+    },
+    "required": ["pos", "meaning", "synonyms", "antonyms", "example"],
+    "additionalProperties": False,
+}
+_LEXICON_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "lexicon",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "word": {"type": "string"},
+                "entries": {"type": "array", "items": _ENTRY_SCHEMA},
+            },
+            "required": ["word", "entries"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# Multi-term glossary: several terms per request, each shaped like a lexicon answer.
+_GLOSSARY_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "glossary",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "terms": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "term": {"type": "string"},
+                            "word": {"type": "string"},
+                            "entries": {"type": "array", "items": _ENTRY_SCHEMA},
+                        },
+                        "required": ["term", "word", "entries"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["terms"],
+            "additionalProperties": False,
+        },
+    },
+}
+_GLOSSARY_ENTRIES = 3
+_GLOSSARY_BATCH = 10
+_GLOSSARY_TERMS_PER_PAGE = 5
+_GLOSSARY_STATS = {"terms": 0, "resolved_locally": 0, "batch_requests": 0, "batched": 0, "single_lookups": 0}
+
+# Identical concurrent lookups (a trending word) share one LLM round trip.
+_LEXICON_FLIGHT = SingleFlight("lexicon")
+# The one-liner hedge/fallback is shared the same way, by normalized word, but
+# isn't cached, so it is cancelled once every lookup waiting on it has moved on.
+_ONE_LINER_FLIGHT = SingleFlight("one-liner", cancel_abandoned=True)
+
+# Latencies of recent full lookups, for picking when to hedge.
+_PRIMARY_LATENCIES: Deque[float] = deque(maxlen=200)
+_HEDGE_MIN_SAMPLES = 20
+_STATS = {"primary": 0, "hedged": 0, "hedge_wins": 0, "fallbacks": 0}
+
 # ---------------- Utilities ----------------
 
 def _strip_code_fences(text: str) -> str:
@@ -62,13 +144,13 @@ def _clean_entries(raw_entries: List[Dict[str, Any]], max_entries: int) -> List[
         cleaned.append({"pos": pos, "meaning": meaning, "synonyms": syns, "antonyms": ants, "example": example})
     return cleaned
 
-async def _one_liner(word: str) -> str:
-    client = get_client()
+async def _one_liner(word: str, priority: int = gpt_utils.INTERACTIVE) -> str:
     prompt = (
         f"Give ONE short main meaning (<= 18 words) for: {word}\n"
         "Plain text only; no quotes."
     )
-    res = await client.chat.completions.create(
+    res = await gpt_utils.chat(
+        "definition one-liner", priority,
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": _SYSTEM},
@@ -80,50 +162,43 @@ async def _one_liner(word: str) -> str:
     text = (res.choices[0].message.content or "").strip()
     return text
 
+async def _shared_one_liner(word: str, priority: int = gpt_utils.INTERACTIVE) -> str:
+    """_one_liner(), with concurrent callers for the same word sharing one request."""
+    return await _ONE_LINER_FLIGHT.do(lexicon_cache.normalize_word(word), lambda: _one_liner(word, priority))
+
 # ---------------- Core query ----------------
 
-async def _query_lexicon(word: str, max_entries: int) -> Dict[str, Any]:
+async def _ask_lexicon(word: str, max_entries: int, priority: int) -> Optional[Dict[str, Any]]:
     """
-    Ask the LLM for compact dictionary data, robust to JSON hiccups.
-    Always returns at least one usable entry.
+    Ask the LLM for compact dictionary data in one schema-constrained pass.
+    Returns None if it produced no usable entry (e.g. a refusal).
     """
-    client = get_client()
     user_prompt = f"Word: {word}\nMax entries: {max_entries}\n\n{_JSON_INSTRUCTIONS}"
-
-    # Pass 1: strict JSON mode
-    res = await client.chat.completions.create(
+    res = await gpt_utils.chat(
+        "definition", priority,
         model="gpt-4o-mini",
         messages=[{"role": "system", "content": _SYSTEM}, {"role": "user", "content": user_prompt}],
-        response_format={"type": "json_object"},
+        response_format=_LEXICON_FORMAT,
         max_tokens=500,
         temperature=0.2,
     )
     parsed = _safe_json_loads(res.choices[0].message.content or "")
-    if not parsed:
-        # Pass 2: retry with simpler guidance (still JSON mode)
-        res2 = await client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": _SYSTEM},
-                {"role": "user",
-                 "content": f"Word: {word}\nReturn 1-4 entries.\n{_JSON_INSTRUCTIONS}"},
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=400,
-            temperature=0.2,
-        )
-        parsed = _safe_json_loads(res2.choices[0].message.content or "")
 
     entries = _clean_entries((parsed or {}).get("entries") or [], max_entries)
+    if not entries:
+        return None
     out_word = str((parsed or {}).get("word", word)).strip() or word
+    return {"word": out_word, "entries": entries}
 
-    if entries:
-        return {"word": out_word, "entries": entries}
+async def _ask_and_cache(word: str, max_entries: int, priority: int) -> Optional[Dict[str, Any]]:
+    data = await _ask_lexicon(word, max_entries, priority)
+    if data:
+        await lexicon_cache.put(word, max_entries, data)
+    return data
 
-    # Final fallback: guarantee a valid single entry
-    meaning = await _one_liner(word)
-    fallback = {
-        "word": out_word,
+def _fallback_entry(word: str, meaning: str) -> Dict[str, Any]:
+    return {
+        "word": word,
         "entries": [{
             "pos": "meaning",
             "meaning": meaning or "A commonly used English term.",
@@ -132,7 +207,153 @@ async def _query_lexicon(word: str, max_entries: int) -> Dict[str, Any]:
             "example": None,
         }]
     }
-    return fallback
+
+def _hedge_delay() -> Optional[float]:
+    """Seconds to give the full lookup before racing a one-liner, or None to never hedge."""
+    if not LEXICON_HEDGE_PERCENTILE or len(_PRIMARY_LATENCIES) < _HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(_PRIMARY_LATENCIES)
+    idx = min(len(ordered) - 1, int(len(ordered) * LEXICON_HEDGE_PERCENTILE / 100))
+    return ordered[idx]
+
+async def _timed_ask_and_cache(word: str, max_entries: int, priority: int) -> Optional[Dict[str, Any]]:
+    # Runs inside the shielded single-flight task, so calls that lost to the
+    # hedge are still timed and slow calls keep the percentile honest.
+    started = time.monotonic()
+    data = await _ask_and_cache(word, max_entries, priority)
+    _PRIMARY_LATENCIES.append(time.monotonic() - started)
+    return data
+
+async def _query_lexicon(word: str, max_entries: int, priority: int = gpt_utils.INTERACTIVE) -> Dict[str, Any]:
+    """
+    Cached dictionary lookup. Always returns at least one usable entry.
+
+    Once the full lookup runs past the LEXICON_HEDGE_PERCENTILE latency of
+    recent lookups, a one-liner is raced against it and the first usable
+    answer wins. One-liner answers are not cached, so a later lookup gets
+    another chance at a proper answer.
+    """
+    # Everyday words: answered from the local index, no network or tokens.
+    local = local_lexicon.lookup(word, max_entries)
+    if local:
+        return local
+
+    cached = await lexicon_cache.get(word, max_entries)
+    if cached:
+        return cached
+
+    key = (lexicon_cache.normalize_word(word), max_entries)
+    primary = asyncio.ensure_future(
+        _LEXICON_FLIGHT.do(key, lambda: _timed_ask_and_cache(word, max_entries, priority))
+    )
+    delay = _hedge_delay()
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if primary in done:
+        data = primary.result()
+        if data:
+            _STATS["primary"] += 1
+            return data
+        # No usable entries: the one-liner is all that's left.
+        _STATS["fallbacks"] += 1
+        return _fallback_entry(word, await _shared_one_liner(word, priority))
+
+    _STATS["hedged"] += 1
+    hedge = asyncio.ensure_future(_shared_one_liner(word, priority))
+    pending = {primary, hedge}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if primary in done and primary.exception() is None and primary.result():
+                _STATS["primary"] += 1
+                return primary.result()
+            if hedge in done and hedge.exception() is None and hedge.result():
+                _STATS["hedge_wins"] += 1
+                return _fallback_entry(word, hedge.result())
+        # Neither produced anything usable; surface the primary's error if it had one.
+        primary.result()
+        _STATS["fallbacks"] += 1
+        return _fallback_entry(word, "")
+    finally:
+        # Cancel the loser. A losing one-liner is cancelled once no other lookup
+        # waits on it; the full lookup always finishes and fills the cache.
+        for fut in pending:
+            fut.cancel()
+
+async def _ask_glossary_batch(terms: List[str]) -> Dict[str, Dict[str, Any]]:
+    """One LLM call for several terms. Returns normalized term -> {"word", "entries"} for the terms it answered."""
+    listing = "\n".join(f"- {term}" for term in terms)
+    prompt = (
+        f"Terms:\n{listing}\n\n"
+        "For EACH term return an object with: term (exactly as given), word (the headword), "
+        f"entries (1-{_GLOSSARY_ENTRIES} objects). Each entry has: pos (lowercase like 'noun' or 'verb'), "
+        "meaning (<= 22 words, simple wording), synonyms (0-5 short strings), "
+        "antonyms (0-5 short strings), example (<= 16 words)."
+    )
+    res = await gpt_utils.chat(
+        "glossary batch", gpt_utils.BACKGROUND,
+        model="gpt-4o-mini",
+        messages=[{"role": "system", "content": _SYSTEM}, {"role": "user", "content": prompt}],
+        response_format=_GLOSSARY_FORMAT,
+        max_tokens=200 * len(terms),
+        temperature=0.2,
+    )
+    parsed = _safe_json_loads(res.choices[0].message.content or "") or {}
+    wanted = {lexicon_cache.normalize_word(term) for term in terms}
+    answers: Dict[str, Dict[str, Any]] = {}
+    for item in parsed.get("terms") or []:
+        if not isinstance(item, dict):
+            continue
+        key = lexicon_cache.normalize_word(str(item.get("term", "")))
+        entries = _clean_entries(item.get("entries") or [], _GLOSSARY_ENTRIES)
+        if key in wanted and entries:
+            answers[key] = {"word": str(item.get("word") or "").strip() or key, "entries": entries}
+    return answers
+
+async def _resolve_glossary(terms: List[str]) -> List[Dict[str, Any]]:
+    """
+    Glossary data for each term, in order: local index and cache first, then
+    one batched LLM request per _GLOSSARY_BATCH missing terms. Terms a batch
+    skipped (or a failed batch) go through the single-term path.
+    """
+    found: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+    for term in terms:
+        data = local_lexicon.lookup(term, _GLOSSARY_ENTRIES) or await lexicon_cache.get(term, _GLOSSARY_ENTRIES)
+        if data:
+            found[term] = data
+        else:
+            missing.append(term)
+    _GLOSSARY_STATS["terms"] += len(terms)
+    _GLOSSARY_STATS["resolved_locally"] += len(found)
+
+    chunks = [missing[i:i + _GLOSSARY_BATCH] for i in range(0, len(missing), _GLOSSARY_BATCH)]
+    answers = await asyncio.gather(*(_ask_glossary_batch(chunk) for chunk in chunks), return_exceptions=True)
+    for chunk, answer in zip(chunks, answers):
+        _GLOSSARY_STATS["batch_requests"] += 1
+        if isinstance(answer, Exception):
+            continue
+        for term in chunk:
+            data = answer.get(lexicon_cache.normalize_word(term))
+            if data:
+                found[term] = data
+                _GLOSSARY_STATS["batched"] += 1
+                await lexicon_cache.put(term, _GLOSSARY_ENTRIES, data)
+
+    leftovers = [term for term in missing if term not in found]
+    _GLOSSARY_STATS["single_lookups"] += len(leftovers)
+    singles = await asyncio.gather(
+        *(_query_lexicon(term, _GLOSSARY_ENTRIES, priority=gpt_utils.BACKGROUND) for term in leftovers)
+    )
+    found.update(zip(leftovers, singles))
+    return [found[term] for term in terms]
+
+def definition_stats() -> Dict[str, Any]:
+    delay = _hedge_delay()
+    return {
+        **_STATS,
+        "hedge_after_s": delay if delay is not None else "off",
+        **{f"glossary {k}": v for k, v in _GLOSSARY_STATS.items()},
+    }
 
 # ---------------- Embed builders ----------------
 
@@ -184,6 +405,23 @@ def _build_glossary_embed_from_entries(word: str, entries: List[Dict[str, Any]])
         e.add_field(name=pos or "meaning", value="\n".join(lines)[:1024], inline=False)
     return e
 
+def _build_glossary_pages(results: List[Dict[str, Any]]) -> List[discord.Embed]:
+    pages: List[discord.Embed] = []
+    chunks = [results[i:i + _GLOSSARY_TERMS_PER_PAGE] for i in range(0, len(results), _GLOSSARY_TERMS_PER_PAGE)]
+    for number, chunk in enumerate(chunks, start=1):
+        e = base_embed("📘 Glossary")
+        for data in chunk:
+            entries = data.get("entries") or []
+            lines = [f"*{item['pos']}* — {item['meaning']}" for item in entries[:_GLOSSARY_ENTRIES]]
+            if entries and entries[0].get("synonyms"):
+                lines.append(f"**Synonyms:** {', '.join(entries[0]['synonyms'][:5])}")
+            if entries and entries[0].get("example"):
+                lines.append(f"**Example:** _{entries[0]['example']}_")
+            e.add_field(name=data["word"][:256], value="\n".join(lines)[:1024] or "—", inline=False)
+        e.set_footer(text=f"Page {number}/{len(chunks)} • {len(results)} terms")
+        pages.append(e)
+    return pages
+
 # ---------------- Public functions ----------------
 
 async def fetch_definition(word: str, full: bool = False):
@@ -191,7 +429,7 @@ async def fetch_definition(word: str, full: bool = False):
     Used by:
       - !owl def  (full=False)
       - !owl deff (full=True)
-    Always uses GPT; no external dictionary API.
+    Uses the local lexicon index when one is built, GPT otherwise; no external dictionary API.
     """
     word = (word or "").strip()
     if not word:
@@ -200,7 +438,7 @@ async def fetch_definition(word: str, full: bool = False):
     entries = data.get("entries", [])
     if not entries:
         # Should not happen, but keep a graceful fallback
-        one = await _one_liner(word)
+        one = await _shared_one_liner(word)
         return result_embed(f"🔍 Definition of **{word}**", one or "A commonly used English term.")
     return _build_full_embed_from_entries(data["word"], entries) if full \
         else _build_simple_embed_from_entries(data["word"], entries)
@@ -208,14 +446,24 @@ async def fetch_definition(word: str, full: bool = False):
 async def fetch_glossary(word: str):
     """
     Used by the dictionary-channel watcher.
-    Always uses GPT; returns short meanings + syns/ants + one example each.
+    Local lexicon index or GPT; returns short meanings + syns/ants + one example each.
     """
     word = (word or "").strip()
     if not word:
         return error_embed("Please provide a word.")
-    data = await _query_lexicon(word, max_entries=3)
+    data = await _query_lexicon(word, max_entries=3, priority=gpt_utils.BACKGROUND)
     entries = data.get("entries", [])
     if not entries:
-        one = await _one_liner(word)
+        one = await _shared_one_liner(word, gpt_utils.BACKGROUND)
         return result_embed(f"📘 {word}: quick meanings", one or "A commonly used English term.")
     return _build_glossary_embed_from_entries(data["word"], entries)
+
+async def fetch_glossary_batch(terms: List[str]) -> List[discord.Embed]:
+    """
+    Used by the dictionary-channel watcher for lists of terms.
+    Returns glossary pages, several terms per embed.
+    """
+    terms = [t.strip() for t in terms if t and t.strip()]
+    if not terms:
+        return [error_embed("Please provide a word.")]
+    return _build_glossary_pages(await _resolve_glossary(terms))
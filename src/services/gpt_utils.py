@@ -1,10 +1,306 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import openai
 from openai import AsyncOpenAI
-from src.config import OPENAI_API_KEY
+from src.config import (
+    OPENAI_API_KEY,
+    OPENAI_RPM,
+    OPENAI_TPM,
+    OPENAI_MAX_CONCURRENCY,
+    OPENAI_MAX_RETRIES,
+)
+
+log = logging.getLogger("owl.openai")
+
+# Priority classes: lower runs first when requests are waiting for a slot.
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_RETRYABLE = (
+    openai.RateLimitError,
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.InternalServerError,
+)
+_BACKOFF_BASE_S = 0.5
+_BACKOFF_MAX_S = 20.0
 
 _client: AsyncOpenAI | None = None
 
 def get_client() -> AsyncOpenAI:
     global _client
     if _client is None:
-        _client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        # Retries are handled by the scheduler so they respect the shared limits.
+        _client = AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=0)
     return _client
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute, holding at most one minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(1.0, float(per_minute))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)."""
+        # A request larger than the bucket only waits for a full bucket.
+        amount = min(amount, self.capacity)
+        self._refill()
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        # Negative amounts charge extra usage that the estimate missed.
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class _SiteStats:
+    __slots__ = ("calls", "errors", "retries", "latency_s", "prompt_tokens", "completion_tokens")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.latency_s = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+
+class OpenAIScheduler:
+    """
+    Shared gate in front of the OpenAI client: RPM/TPM token buckets and a
+    concurrency cap, both handed out by priority class (FIFO within a class),
+    and retries with jittered exponential backoff. A 429 pauses every caller,
+    not just the one that hit it; nobody holds a slot while paused.
+    """
+
+    def __init__(self, rpm: int, tpm: int, concurrency: int, max_retries: int):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(0, max_retries)
+        self.in_flight = 0
+        self.rate_limited = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        # [priority, seq, wake]: only the first in line watches the buckets.
+        self._admission: List[List[Any]] = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._sites: Dict[str, _SiteStats] = {}
+
+    # ---------- concurrency slots ----------
+
+    async def _acquire(self, priority: int):
+        if self.in_flight < self.concurrency and not self._waiters:
+            self.in_flight += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._seq), fut)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release()  # slot was handed over just as we were cancelled
+            else:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def _release(self):
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)  # hand the slot straight to the next waiter
+                return
+        self.in_flight -= 1
+
+    # ---------- requests ----------
+
+    @staticmethod
+    def _estimate_tokens(kwargs: Dict[str, Any]) -> int:
+        chars = sum(len(str(m.get("content") or "")) for m in kwargs.get("messages", []))
+        return chars // 4 + int(kwargs.get("max_tokens") or 256)
+
+    def _backoff(self, attempt: int, err: Exception) -> float:
+        retry_after = None
+        response = getattr(err, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                pass
+        delay = random.uniform(0, min(_BACKOFF_MAX_S, _BACKOFF_BASE_S * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    def _admission_delay(self, estimate: int) -> float:
+        return max(
+            self._paused_until - time.monotonic(),
+            self.requests.wait_time(1),
+            self.tokens.wait_time(estimate),
+        )
+
+    def _wake_first(self):
+        if self._admission and not self._admission[0][2].done():
+            self._admission[0][2].set_result(None)
+
+    async def _admit(self, priority: int, estimate: int):
+        """Wait for the 429 pause and the RPM/TPM buckets, in priority order."""
+        loop = asyncio.get_running_loop()
+        entry = [priority, next(self._seq), loop.create_future()]
+        heapq.heappush(self._admission, entry)
+        try:
+            while True:
+                delay = None
+                if self._admission[0] is entry:
+                    delay = self._admission_delay(estimate)
+                    if delay <= 0:
+                        self.requests.take(1)
+                        self.tokens.take(estimate)
+                        return
+                # Woken early when we reach the front of the line.
+                await asyncio.wait({entry[2]}, timeout=delay)
+                if entry[2].done():
+                    entry[2] = loop.create_future()
+        finally:
+            self._admission.remove(entry)
+            heapq.heapify(self._admission)
+            self._wake_first()
+
+    def _retry_delay(self, site: str, stats: _SiteStats, attempt: int, err: Exception) -> float:
+        delay = self._backoff(attempt, err)
+        if isinstance(err, openai.RateLimitError):
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        stats.retries += 1
+        log.warning(f"{site}: {type(err).__name__}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+        return delay
+
+    def _record_usage(self, stats: _SiteStats, usage, estimate: int):
+        if usage is None:
+            return
+        stats.prompt_tokens += usage.prompt_tokens or 0
+        stats.completion_tokens += usage.completion_tokens or 0
+        self.tokens.give_back(estimate - (usage.total_tokens or estimate))
+
+    async def chat(self, site: str, priority: int = BACKGROUND, **kwargs):
+        """`chat.completions.create(**kwargs)` through the shared limits. `site` labels the stats."""
+        stats = self._sites.setdefault(site, _SiteStats())
+        stats.calls += 1
+        estimate = self._estimate_tokens(kwargs)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            await self._admit(priority, estimate)
+            await self._acquire(priority)
+            try:
+                res = await get_client().chat.completions.create(**kwargs)
+            except _RETRYABLE as e:
+                if attempt >= self.max_retries:
+                    stats.errors += 1
+                    raise
+                delay = self._retry_delay(site, stats, attempt, e)
+                attempt += 1
+            except Exception:
+                stats.errors += 1
+                raise
+            else:
+                self._record_usage(stats, getattr(res, "usage", None), estimate)
+                stats.latency_s += time.monotonic() - started
+                return res
+            finally:
+                self._release()
+            await asyncio.sleep(delay)
+
+    async def stream(self, site: str, priority: int = BACKGROUND, **kwargs) -> AsyncIterator[str]:
+        """
+        Like chat(), but yields the reply's text as it is generated. Only
+        failures before the first piece of text are retried; the slot is held
+        until the stream ends, so consumers should not block between chunks.
+        """
+        stats = self._sites.setdefault(site, _SiteStats())
+        stats.calls += 1
+        estimate = self._estimate_tokens(kwargs)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            emitted = False
+            await self._admit(priority, estimate)
+            await self._acquire(priority)
+            try:
+                chunks = await get_client().chat.completions.create(
+                    stream=True, stream_options={"include_usage": True}, **kwargs
+                )
+                async for chunk in chunks:
+                    self._record_usage(stats, getattr(chunk, "usage", None), estimate)
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        emitted = True
+                        yield delta
+            except _RETRYABLE as e:
+                if emitted or attempt >= self.max_retries:
+                    stats.errors += 1
+                    raise
+                delay = self._retry_delay(site, stats, attempt, e)
+                attempt += 1
+            except Exception:
+                stats.errors += 1
+                raise
+            else:
+                stats.latency_s += time.monotonic() - started
+                return
+            finally:
+                self._release()
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "in flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "waiting for limits": len(self._admission),
+            "rate limited": self.rate_limited,
+        }
+        for site, s in sorted(self._sites.items()):
+            ok = s.calls - s.errors
+            avg_ms = (s.latency_s / ok * 1000) if ok else 0.0
+            out[site] = (
+                f"{s.calls} calls, {avg_ms:.0f} ms avg, "
+                f"{s.prompt_tokens}+{s.completion_tokens} tok, {s.retries} retries, {s.errors} errors"
+            )
+        return out
+
+
+_SCHEDULER: Optional[OpenAIScheduler] = None
+
+def get_scheduler() -> OpenAIScheduler:
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        _SCHEDULER = OpenAIScheduler(OPENAI_RPM, OPENAI_TPM, OPENAI_MAX_CONCURRENCY, OPENAI_MAX_RETRIES)
+    return _SCHEDULER
+
+async def chat(site: str, priority: int = BACKGROUND, **kwargs):
+    return await get_scheduler().chat(site, priority, **kwargs)
+
+async def chat_stream(site: str, priority: int = BACKGROUND, **kwargs) -> AsyncIterator[str]:
+    async for delta in get_scheduler().stream(site, priority, **kwargs):
+        yield delta
+
+def openai_stats() -> Dict[str, Any]:
+    return get_scheduler().stats()
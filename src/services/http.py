@@ -0,0 +1,23 @@
+from typing import Optional
+
+import aiohttp
+
+_SESSION: Optional[aiohttp.ClientSession] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    # One keep-alive session for the app's lifetime; closed from run.py on shutdown.
+    global _SESSION
+    if _SESSION is None or _SESSION.closed:
+        _SESSION = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=None, connect=15, sock_read=60),
+        )
+    return _SESSION
+
+
+async def close_session():
+    global _SESSION
+    session, _SESSION = _SESSION, None
+    if session is not None and not session.closed:
+        await session.close()
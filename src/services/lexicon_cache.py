@@ -0,0 +1,92 @@
+import logging
+import time
+from typing import Any, Dict, Optional, Set
+
+from src.config import LEXICON_CACHE_MAX_ROWS, LEXICON_CACHE_SIZE, LEXICON_CACHE_TTL
+from src.persistence import lexicon_store
+from src.services.lru import LRUCache
+
+# Memory tier: normalized word -> (max_entries requested, {"word", "entries"}).
+# A result fetched with more entries also serves smaller requests, so one
+# `deff` (6) covers later `def` (4) and glossary (3) lookups.
+_MEMORY = LRUCache(LEXICON_CACHE_SIZE, ttl=LEXICON_CACHE_TTL)
+_STATS = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evicted_rows": 0}
+_EVICT_EVERY = 100
+
+# Memory hits are written back to SQLite's last_used in batches, so the
+# on-disk LRU eviction sees the hot words too, not just cold reads.
+_TOUCHED: Set[str] = set()
+_TOUCH_FLUSH_S = 60.0
+_TOUCH_FLUSH_MAX = 100
+_last_touch_flush = time.monotonic()
+
+log = logging.getLogger("owl.lexicon_cache")
+
+
+def normalize_word(word: str) -> str:
+    return " ".join((word or "").lower().split())
+
+def _slice(data: Dict[str, Any], max_entries: int) -> Dict[str, Any]:
+    return {"word": data["word"], "entries": data["entries"][:max_entries]}
+
+async def _flush_touches():
+    global _last_touch_flush
+    _last_touch_flush = time.monotonic()
+    if not _TOUCHED:
+        return
+    words = list(_TOUCHED)
+    _TOUCHED.clear()
+    try:
+        await lexicon_store.touch_lexicons(words)
+    except Exception as e:
+        log.warning(f"Lexicon cache last_used update failed: {e}")
+
+def cache_stats() -> Dict[str, Any]:
+    lookups = _STATS["memory_hits"] + _STATS["disk_hits"] + _STATS["misses"]
+    hits = _STATS["memory_hits"] + _STATS["disk_hits"]
+    return {**_STATS, "hit_rate": (hits / lookups) if lookups else 0.0, "memory_size": len(_MEMORY)}
+
+async def get(word: str, max_entries: int) -> Optional[Dict[str, Any]]:
+    key = normalize_word(word)
+    cached = _MEMORY.get(key)
+    if cached is not None and cached[0] >= max_entries:
+        _STATS["memory_hits"] += 1
+        _TOUCHED.add(key)
+        if len(_TOUCHED) >= _TOUCH_FLUSH_MAX or time.monotonic() - _last_touch_flush >= _TOUCH_FLUSH_S:
+            await _flush_touches()
+        return _slice(cached[1], max_entries)
+
+    try:
+        row = await lexicon_store.get_lexicon(key)
+    except Exception as e:
+        log.warning(f"Lexicon cache read failed for {key!r}: {e}")
+        row = None
+    if row is not None:
+        stored_max, data, created_at = row
+        if stored_max >= max_entries and created_at >= time.time() - LEXICON_CACHE_TTL:
+            _STATS["disk_hits"] += 1
+            _MEMORY.put(key, (stored_max, data))
+            try:
+                await lexicon_store.touch_lexicon(key)
+            except Exception:
+                pass
+            return _slice(data, max_entries)
+
+    _STATS["misses"] += 1
+    return None
+
+async def put(word: str, max_entries: int, data: Dict[str, Any]) -> None:
+    key = normalize_word(word)
+    cached = _MEMORY.get(key)
+    if cached is not None and cached[0] > max_entries:
+        # Keep the richer result we already have.
+        return
+    _MEMORY.put(key, (max_entries, data))
+    try:
+        await lexicon_store.put_lexicon(key, max_entries, data)
+        _STATS["writes"] += 1
+        if _STATS["writes"] % _EVICT_EVERY == 0:
+            await _flush_touches()  # evict by up-to-date recency
+            _STATS["evicted_rows"] += await lexicon_store.evict_lexicon(LEXICON_CACHE_TTL, LEXICON_CACHE_MAX_ROWS)
+    except Exception as e:
+        log.warning(f"Lexicon cache write failed for {key!r}: {e}")
@@ -0,0 +1,206 @@
+"""
+Optional offline dictionary: a JSONL dump compiled into a memory-mapped
+index that is searched before the lexicon cache and the LLM.
+
+Each input line is either a whole word,
+    {"word": "owl", "entries": [{"pos": "noun", "meaning": "...", "synonyms": [...], ...}]}
+or a single sense (WordNet-style, one synset per line),
+    {"word": "owl", "pos": "noun", "meaning": "...", "synonyms": [...], ...}
+Senses of the same word are merged in file order.
+
+    python -m src.services.local_lexicon build data/lexicon.jsonl [data/lexicon.idx]
+    python -m src.services.local_lexicon lookup owl
+
+Index layout (little-endian):
+    header   magic, word count, offset of the key blob, offset of the data blob
+    records  one (key offset, key length, data offset, data length) per word, sorted by key
+    keys     normalized words, UTF-8, concatenated
+    data     compact JSON {"word", "entries"} per word
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import LOCAL_LEXICON_PATH
+from src.services.lexicon_cache import normalize_word
+
+log = logging.getLogger("owl.local_lexicon")
+
+_MAGIC = b"OWLLEX1\0"
+_HEADER = struct.Struct("<8sIQQ")
+_RECORD = struct.Struct("<QIQI")
+_MAX_ENTRIES = 6  # the most any command asks for (!owl deff)
+
+_STATS = {"hits": 0, "misses": 0}
+
+
+class LexiconIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        magic, self.count, self._keys_at, self._data_at = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a lexicon index")
+
+    def _record(self, i: int) -> Tuple[int, int, int, int]:
+        return _RECORD.unpack_from(self._mm, _HEADER.size + i * _RECORD.size)
+
+    def _key(self, key_off: int, key_len: int) -> bytes:
+        start = self._keys_at + key_off
+        return self._mm[start:start + key_len]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        target = key.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_off, key_len, data_off, data_len = self._record(mid)
+            probe = self._key(key_off, key_len)
+            if probe < target:
+                lo = mid + 1
+            elif probe > target:
+                hi = mid
+            else:
+                start = self._data_at + data_off
+                return json.loads(self._mm[start:start + data_len])
+        return None
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+_INDEX: Optional[LexiconIndex] = None
+_LOADED = False
+
+def _index() -> Optional[LexiconIndex]:
+    global _INDEX, _LOADED
+    if not _LOADED:
+        _LOADED = True
+        if LOCAL_LEXICON_PATH and os.path.exists(LOCAL_LEXICON_PATH):
+            try:
+                _INDEX = LexiconIndex(LOCAL_LEXICON_PATH)
+                log.info(f"Local lexicon: {_INDEX.count} words from {LOCAL_LEXICON_PATH}")
+            except (OSError, ValueError) as e:
+                log.warning(f"Couldn't open local lexicon {LOCAL_LEXICON_PATH}: {e}")
+    return _INDEX
+
+def lookup(word: str, max_entries: int) -> Optional[Dict[str, Any]]:
+    """Entries for `word` from the local index, or None if there is no index or no match."""
+    index = _index()
+    if index is None:
+        return None
+    data = index.get(normalize_word(word))
+    if data is None:
+        _STATS["misses"] += 1
+        return None
+    _STATS["hits"] += 1
+    return {"word": data["word"], "entries": data["entries"][:max_entries]}
+
+def local_lexicon_stats() -> Dict[str, Any]:
+    index = _index()
+    lookups = _STATS["hits"] + _STATS["misses"]
+    return {
+        "words": index.count if index else "no index",
+        **_STATS,
+        "hit_rate": (_STATS["hits"] / lookups) if lookups else 0.0,
+    }
+
+# ---------------- Building ----------------
+
+def _read_source(path: str) -> Dict[str, Tuple[str, List[Dict[str, Any]]]]:
+    words: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                log.warning(f"{path}:{lineno}: not JSON, skipped")
+                continue
+            word = str(obj.get("word") or "").strip() if isinstance(obj, dict) else ""
+            if not word:
+                continue
+            senses = obj.get("entries") if "entries" in obj else [obj]
+            _, entries = words.setdefault(normalize_word(word), (word, []))
+            entries.extend(s for s in senses or [] if isinstance(s, dict))
+    return words
+
+def build(source: str, output: str) -> int:
+    """Compile a JSONL dump into an index at `output`. Returns the number of words written."""
+    # Imported here: definitions imports this module to consult the index.
+    from src.services.definitions import _clean_entries
+
+    records = []
+    for key, (word, raw) in _read_source(source).items():
+        entries = _clean_entries(raw, _MAX_ENTRIES)
+        if entries:
+            records.append((key.encode("utf-8"), json.dumps(
+                {"word": word, "entries": entries}, ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")))
+    records.sort(key=lambda r: r[0])
+
+    keys_at = _HEADER.size + len(records) * _RECORD.size
+    keys_len = sum(len(k) for k, _ in records)
+    data_at = keys_at + keys_len
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    tmp = f"{output}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(records), keys_at, data_at))
+        key_off = data_off = 0
+        for key, data in records:
+            f.write(_RECORD.pack(key_off, len(key), data_off, len(data)))
+            key_off += len(key)
+            data_off += len(data)
+        for key, _ in records:
+            f.write(key)
+        for _, data in records:
+            f.write(data)
+    os.replace(tmp, output)
+    return len(records)
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m src.services.local_lexicon")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="compile a JSONL dump into an index")
+    p_build.add_argument("source")
+    p_build.add_argument("output", nargs="?", default=LOCAL_LEXICON_PATH or "data/lexicon.idx")
+    p_lookup = sub.add_parser("lookup", help="look a word up in an index")
+    p_lookup.add_argument("word")
+    p_lookup.add_argument("--index", default=LOCAL_LEXICON_PATH or "data/lexicon.idx")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        started = time.perf_counter()
+        count = build(args.source, args.output)
+        print(f"{count} words -> {args.output} ({os.path.getsize(args.output) / 1048576:.1f} MB, "
+              f"{time.perf_counter() - started:.1f}s)")
+        return
+    index = LexiconIndex(args.index)
+    started = time.perf_counter()
+    data = index.get(normalize_word(args.word))
+    elapsed_us = (time.perf_counter() - started) * 1e6
+    if data is None:
+        print(f"not found ({elapsed_us:.0f} µs)")
+        sys.exit(1)
+    print(json.dumps(data, ensure_ascii=False, indent=2))
+    print(f"({elapsed_us:.0f} µs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import discord
+
+log = logging.getLogger("owl.outbound")
+
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+MAX_REACTIONS = 20
+
+# Discord's per-channel limits: (calls, per seconds). Staying under them
+# avoids 429s, which count towards the global invalid-request ban.
+_ROUTE_LIMITS = {
+    "message": (5, 5.0),
+    "edit": (5, 5.0),
+    "reaction": (1, 0.25),
+}
+_MAX_BUCKETS = 1000
+
+
+class _RouteBucket:
+    """Sliding-window limiter for one (route, channel) pair; calls on it run one at a time."""
+
+    def __init__(self, limit: int, per: float):
+        self.limit = limit
+        self.per = per
+        self.sent: Deque[float] = deque(maxlen=limit)
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+    async def wait(self) -> float:
+        waited = 0.0
+        if len(self.sent) == self.limit:
+            delay = self.per - (time.monotonic() - self.sent[0])
+            if delay > 0:
+                await asyncio.sleep(delay)
+                waited = delay
+        now = time.monotonic()
+        self.sent.append(now)
+        self.last_used = now
+        return waited
+
+
+_BUCKETS: Dict[Tuple[str, Hashable], _RouteBucket] = {}
+_EVENTS: Dict[str, Dict[str, int]] = {}
+_ROUTES = {"throttled": 0, "throttled_s": 0.0, "rate_limited": 0}
+_PENDING: Dict[Hashable, List[Tuple[discord.Embed, asyncio.Future]]] = {}
+_FLUSHERS: Dict[Hashable, asyncio.Task] = {}
+
+def _bucket(route: str, channel_id: Hashable) -> _RouteBucket:
+    key = (route, channel_id)
+    bucket = _BUCKETS.get(key)
+    if bucket is None:
+        if len(_BUCKETS) >= _MAX_BUCKETS:
+            cutoff = time.monotonic() - 60
+            for k in [k for k, b in _BUCKETS.items() if b.last_used < cutoff and not b.lock.locked()]:
+                del _BUCKETS[k]
+        bucket = _BUCKETS[key] = _RouteBucket(*_ROUTE_LIMITS[route])
+    return bucket
+
+async def _call(route: str, channel_id: Hashable, coro_fn):
+    bucket = _bucket(route, channel_id)
+    async with bucket.lock:
+        waited = await bucket.wait()
+        if waited:
+            _ROUTES["throttled"] += 1
+            _ROUTES["throttled_s"] += waited
+        try:
+            return await coro_fn()
+        except discord.HTTPException as e:
+            if e.status == 429:
+                _ROUTES["rate_limited"] += 1
+            raise
+
+def record(event: str, calls: int, saved: int, events: int = 1):
+    """Count API calls made for an event and how many a naive one-call-per-item version would have added."""
+    stats = _EVENTS.setdefault(event, {"events": 0, "calls": 0, "saved": 0})
+    stats["events"] += events
+    stats["calls"] += calls
+    stats["saved"] += saved
+
+def pack_embeds(embeds: Sequence[discord.Embed]) -> List[List[discord.Embed]]:
+    """Group embeds into as few messages as Discord allows (10 embeds / 6000 characters each)."""
+    groups: List[List[discord.Embed]] = []
+    size = 0
+    for embed in embeds:
+        n = len(embed)
+        if not groups or len(groups[-1]) >= MAX_EMBEDS_PER_MESSAGE or size + n > MAX_EMBED_CHARS_PER_MESSAGE:
+            groups.append([])
+            size = 0
+        groups[-1].append(embed)
+        size += n
+    return groups
+
+async def send_embeds(
+    channel: discord.abc.Messageable,
+    embeds: Sequence[discord.Embed],
+    event: str,
+    count_event: bool = True,
+) -> List[discord.Message]:
+    groups = pack_embeds(embeds)
+    messages = [
+        await _call("message", channel.id, lambda g=group: channel.send(embeds=g))
+        for group in groups
+    ]
+    record(event, len(groups), len(embeds) - len(groups), events=int(count_event))
+    return messages
+
+async def send_embed(
+    channel: discord.abc.Messageable,
+    embed: discord.Embed,
+    event: str,
+    view: Optional[discord.ui.View] = None,
+) -> discord.Message:
+    if view is None:
+        return (await send_embeds(channel, [embed], event))[0]
+    message = await _call("message", channel.id, lambda: channel.send(embed=embed, view=view))
+    record(event, 1, 0)
+    return message
+
+async def edit_embeds(message: discord.Message, embeds: Sequence[discord.Embed], event: str) -> discord.Message:
+    edited = await _call("edit", message.channel.id, lambda: message.edit(embeds=list(embeds)))
+    record(event, 1, len(embeds) - 1, events=0)
+    return edited
+
+async def post_embed(channel: discord.abc.Messageable, embed: discord.Embed, event: str):
+    """
+    Send an embed to a busy channel. The first one goes out straight away;
+    embeds posted while that send is in flight (or throttled) are packed
+    into the next message instead of one message each.
+    """
+    fut = asyncio.get_running_loop().create_future()
+    _PENDING.setdefault(channel.id, []).append((embed, fut))
+    if channel.id not in _FLUSHERS:
+        _FLUSHERS[channel.id] = asyncio.create_task(_flush_channel(channel, event))
+    await fut
+
+async def _flush_channel(channel: discord.abc.Messageable, event: str):
+    try:
+        while _PENDING.get(channel.id):
+            pending = _PENDING.pop(channel.id)
+            group = pack_embeds([embed for embed, _ in pending])[0]
+            batch, rest = pending[:len(group)], pending[len(group):]
+            if rest:
+                _PENDING.setdefault(channel.id, [])[:0] = rest
+            try:
+                await _call("message", channel.id, lambda: channel.send(embeds=group))
+                record(event, 1, len(batch) - 1, events=len(batch))
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_result(None)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+    finally:
+        _FLUSHERS.pop(channel.id, None)
+
+def order_reactions(emojis: Sequence[Optional[str]]) -> List[str]:
+    """Keep the first occurrence of each emoji, in the order given, dropping blanks; Discord caps a message at 20."""
+    seen = set()
+    ordered: List[str] = []
+    for emoji in emojis:
+        if emoji and emoji not in seen:
+            seen.add(emoji)
+            ordered.append(emoji)
+    return ordered[:MAX_REACTIONS]
+
+async def add_reactions(message: discord.Message, emojis: Sequence[Optional[str]], event: str) -> int:
+    """
+    Add reactions in order (callers put the most important first), skipping
+    duplicates. Stops quietly if we lack Add Reactions permission.
+    """
+    ordered = order_reactions(emojis)
+    added = 0
+    for emoji in ordered:
+        try:
+            await _call("reaction", message.channel.id, lambda e=emoji: message.add_reaction(e))
+            added += 1
+        except discord.Forbidden:
+            break
+        except discord.HTTPException as e:
+            log.debug(f"Reaction {emoji!r} rejected: {e}")
+    record(event, added, len([e for e in emojis if e]) - len(ordered), events=0)
+    return added
+
+def outbound_stats() -> Dict[str, Any]:
+    out: Dict[str, Any] = dict(_ROUTES)
+    for event, s in sorted(_EVENTS.items()):
+        per_event = (s["saved"] / s["events"]) if s["events"] else 0.0
+        out[event] = f"{s['events']} events, {s['calls']} calls, {s['saved']} saved ({per_event:.1f}/event)"
+    return out
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import MENTION_HISTORY_TOKENS, MENTION_SUMMARY_TOKENS
+from src.services import gpt_utils
+from src.services.lru import LRUCache
+from src.services.warmup import LazyModel
+
+log = logging.getLogger("owl.prompt")
+
+Turn = Dict[str, str]
+
+# Every chat message costs a few tokens of framing on top of its content.
+_MESSAGE_OVERHEAD = 4
+
+# channel_id -> (id of the newest message folded in, summary text)
+_SUMMARIES = LRUCache(1000)
+_UPDATING: Dict[int, asyncio.Task] = {}
+_STATS = {"prompts": 0, "history_turns_sent": 0, "history_turns_dropped": 0, "summary_updates": 0}
+
+
+def _load_encoding():
+    try:
+        import tiktoken  # optional; counts match the API exactly when installed
+
+        # The first call downloads the BPE file, so this runs in a worker thread.
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        log.info("tiktoken not available, estimating token counts from text length")
+        return None
+
+_ENCODING = LazyModel("tiktoken", _load_encoding)
+
+def load_encoding():
+    """Start loading the tokenizer off the event loop; counts are estimated until it's ready."""
+    _ENCODING.start()
+
+def _encoding():
+    return _ENCODING.value if _ENCODING.ready.is_set() else None
+
+def count_tokens(text: str) -> int:
+    enc = _encoding()
+    if enc is not None:
+        return len(enc.encode(text))
+    # Roughly 4 characters per token for English text.
+    return (len(text) + 3) // 4
+
+def turn_tokens(turn: Turn) -> int:
+    return count_tokens(turn["content"]) + _MESSAGE_OVERHEAD
+
+def fit_newest(turns: List[Turn], budget: int) -> int:
+    """How many of the newest turns fit in `budget` tokens."""
+    used = 0
+    for kept, turn in enumerate(reversed(turns)):
+        used += turn_tokens(turn)
+        if used > budget:
+            return kept
+    return len(turns)
+
+def assemble(
+    channel_id: int,
+    system_prompt: str,
+    history: List[Tuple[int, Turn]],
+    user_text: str,
+    budget: int = MENTION_HISTORY_TOKENS,
+) -> List[Turn]:
+    """
+    Build the chat payload: system prompt, the channel's rolling summary,
+    as much recent history as fits in `budget` tokens, then the user's message.
+    History that no longer fits is folded into the summary in the background.
+    """
+    turns = [turn for _, turn in history]
+    keep = fit_newest(turns, budget)
+    dropped = history[:len(history) - keep]
+
+    payload: List[Turn] = [{"role": "system", "content": system_prompt}]
+    summary = _SUMMARIES.get(channel_id)
+    if summary and history:
+        payload.append({"role": "system", "content": f"Earlier in this channel: {summary[1]}"})
+    payload.extend(turns[len(turns) - keep:])
+    payload.append({"role": "user", "content": user_text})
+
+    _STATS["prompts"] += 1
+    _STATS["history_turns_sent"] += keep
+    _STATS["history_turns_dropped"] += len(dropped)
+
+    folded_upto = summary[0] if summary else 0
+    unsummarized = [(mid, turn) for mid, turn in dropped if mid > folded_upto]
+    if unsummarized and channel_id not in _UPDATING:
+        task = asyncio.create_task(_update_summary(channel_id, summary[1] if summary else None, unsummarized))
+        _UPDATING[channel_id] = task
+        task.add_done_callback(lambda _: _UPDATING.pop(channel_id, None))
+    return payload
+
+async def _update_summary(channel_id: int, previous: Optional[str], new: List[Tuple[int, Turn]]):
+    lines = "\n".join(turn["content"] for _, turn in new)
+    prompt = (
+        f"Current summary of a Discord conversation:\n{previous or '(none yet)'}\n\n"
+        f"Newer messages:\n{lines}\n\n"
+        "Rewrite the summary to cover both. Keep names, topics, open questions and anything "
+        "someone may refer back to. Plain text, a few sentences."
+    )
+    try:
+        res = await gpt_utils.chat(
+            "summary", gpt_utils.BACKGROUND,
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=MENTION_SUMMARY_TOKENS,
+            temperature=0.2,
+        )
+    except Exception as e:
+        log.warning(f"Couldn't update summary for channel {channel_id}: {e}")
+        return
+    text = (res.choices[0].message.content or "").strip()
+    if text:
+        _SUMMARIES.put(channel_id, (new[-1][0], text))
+        _STATS["summary_updates"] += 1
+
+def prompt_stats() -> Dict[str, Any]:
+    return {
+        **_STATS,
+        "summaries": len(_SUMMARIES),
+        "token counter": "tiktoken" if _encoding() is not None else "estimate",
+    }
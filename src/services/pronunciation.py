@@ -1,22 +1,101 @@
+import asyncio
+import hashlib
+import io
+import logging
 import os
-from gtts import gTTS
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from src.config import TTS_CACHE_DIR, TTS_CACHE_MAX_MB
+from src.services.singleflight import SingleFlight
 
 ACCENT_MAP = {
     "us": "com", "uk": "co.uk", "au": "com.au",
     "in": "co.in", "ca": "ca", "ie": "ie", "za": "co.za",
 }
 
-def build_tts(word: str, accent: str = "us") -> str:
-    tld = ACCENT_MAP.get(accent.lower(), "com")
-    safe = word.lower().replace(" ", "_")
-    filename = f"{safe}.mp3" if accent.lower() == "us" else f"{safe}_{accent.lower()}.mp3"
-    tts = gTTS(text=word, lang="en", tld=tld)
-    tts.save(filename)
-    return filename
+_TTS_FLIGHT = SingleFlight("tts")
+_STATS = {"hits": 0, "misses": 0, "evicted_files": 0}
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
 
-def cleanup_file(path: str):
+def _cache_path(key: str) -> str:
+    return os.path.join(TTS_CACHE_DIR, f"{key}.mp3")
+
+def _read_cached(path: str) -> Optional[bytes]:
     try:
-        if os.path.exists(path):
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)  # mtime doubles as "last used" for LRU eviction
+        return data
+    except OSError:
+        return None
+
+def _store(path: str, data: bytes):
+    os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)  # atomic: readers never see a half-written file
+    _evict()
+
+def _evict():
+    # Drop least recently used files until the cache fits its byte budget.
+    budget = TTS_CACHE_MAX_MB * 1024 * 1024
+    files = []
+    for entry in os.scandir(TTS_CACHE_DIR):
+        if entry.is_file() and entry.name.endswith(".mp3"):
+            st = entry.stat()
+            files.append((st.st_mtime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= budget:
+            break
+        try:
             os.remove(path)
-    except Exception:
-        pass
+            total -= size
+            _STATS["evicted_files"] += 1
+        except OSError:
+            pass
+
+def _synthesize(text: str, tld: str) -> bytes:
+    from gtts import gTTS  # imported on first use, not at cog load
+
+    buf = io.BytesIO()
+    gTTS(text=text, lang="en", tld=tld).write_to_fp(buf)
+    return buf.getvalue()
+
+async def _generate(text: str, tld: str, path: str) -> bytes:
+    data = await asyncio.to_thread(_synthesize, text, tld)
+    try:
+        await asyncio.to_thread(_store, path, data)
+    except OSError as e:
+        logging.getLogger("owl.pronunciation").warning(f"Couldn't cache TTS audio: {e}")
+    return data
+
+async def build_tts(word: str, accent: str = "us") -> Tuple[bytes, str]:
+    """
+    MP3 bytes for `word` plus a display filename. Served from a content-addressed
+    on-disk cache keyed by (normalized text, accent); gTTS runs off the event loop.
+    """
+    accent = accent.lower()
+    tld = ACCENT_MAP.get(accent, "com")
+    normalized = _normalize(word)
+    key = hashlib.sha256(f"{accent}\0{normalized}".encode("utf-8")).hexdigest()
+    path = _cache_path(key)
+
+    data = await asyncio.to_thread(_read_cached, path)
+    if data is not None:
+        _STATS["hits"] += 1
+    else:
+        _STATS["misses"] += 1
+        data = await _TTS_FLIGHT.do(key, lambda: _generate(word, tld, path))
+
+    safe = re.sub(r"[^a-z0-9]+", "_", normalized).strip("_")[:40] or "pronunciation"
+    filename = f"{safe}.mp3" if accent == "us" else f"{safe}_{accent}.mp3"
+    return data, filename
+
+def tts_stats() -> Dict[str, Any]:
+    lookups = _STATS["hits"] + _STATS["misses"]
+    return {**_STATS, "hit_rate": (_STATS["hits"] / lookups) if lookups else 0.0}
@@ -1,7 +1,13 @@
+import json
+import logging
 import re
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from src.services.gpt_utils import get_client
+from src.config import RATING_BATCH_ENABLED, RATING_BATCH_WINDOW_S, RATING_BATCH_MAX
+from src.services import gpt_utils
+from src.services.batching import MicroBatcher
+
+log = logging.getLogger("owl.rating")
 
 NUM_EMOJIS = {
     "0": "0️⃣", "1": "1️⃣", "2": "2️⃣", "3": "3️⃣",
@@ -22,7 +28,7 @@ EMOJI_RE = re.compile(
 def extract_emojis(text: str, max_emojis: int = 5) -> List[str]:
     return EMOJI_RE.findall(text)[:max_emojis]
 
-async def rate_message_and_emojis(content: str) -> Tuple[str, List[str]]:
+async def _rate_single(content: str) -> Tuple[str, List[str]]:
     prompt = (
         "You are Owl 🦉, a sharp and witty judge. "
         "First, rate the following message with a single digit based on how cool (0–9). "
@@ -33,8 +39,8 @@ async def rate_message_and_emojis(content: str) -> Tuple[str, List[str]]:
         f"Message:\n\"{content.strip()}\""
     )
 
-    client = get_client()
-    res = await client.chat.completions.create(
+    res = await gpt_utils.chat(
+        "rating", gpt_utils.BACKGROUND,
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": prompt}],
         max_tokens=40,
@@ -47,5 +53,70 @@ async def rate_message_and_emojis(content: str) -> Tuple[str, List[str]]:
     emojis = extract_emojis(em_line.group(1)) if em_line else []
     return score, emojis
 
+def _parse_batch(text: str, count: int) -> List[Optional[Tuple[str, List[str]]]]:
+    results: List[Optional[Tuple[str, List[str]]]] = [None] * count
+    try:
+        ratings = json.loads(text).get("ratings") or []
+    except (ValueError, AttributeError):
+        return results
+    for item in ratings:
+        if not isinstance(item, dict):
+            continue
+        try:
+            idx = int(item.get("id")) - 1
+            score = str(int(item.get("rating")))
+        except (TypeError, ValueError):
+            continue
+        if not 0 <= idx < count or score not in NUM_EMOJIS:
+            continue
+        raw = item.get("emojis") or []
+        emojis = extract_emojis(" ".join(e for e in raw if isinstance(e, str)) if isinstance(raw, list) else str(raw))
+        results[idx] = (score, emojis)
+    return results
+
+async def _rate_batch(contents: List[str]) -> List[Optional[Tuple[str, List[str]]]]:
+    """
+    Rate several messages with one JSON completion. Entries the model skipped
+    or mangled come back as None and are rated one by one by the caller.
+    """
+    if len(contents) == 1:
+        return [await _rate_single(contents[0])]
+
+    listing = "\n".join(f"{i}. \"{c.strip()[:500]}\"" for i, c in enumerate(contents, start=1))
+    prompt = (
+        "You are Owl 🦉, a sharp and witty judge. "
+        "For EACH numbered message below, rate how cool it is with a single digit (0–9) "
+        "and suggest 5 emoji reactions (funny, emotional, expressive) matching its vibe.\n\n"
+        'Return JSON: {"ratings": [{"id": <message number>, "rating": <digit>, "emojis": ["😬", "🔥", ...]}]}\n\n'
+        f"Messages:\n{listing}"
+    )
+    res = await gpt_utils.chat(
+        "rating batch", gpt_utils.BACKGROUND,
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"},
+        max_tokens=40 * len(contents) + 20,
+    )
+    return _parse_batch(res.choices[0].message.content or "", len(contents))
+
+_RATING_BATCHER = MicroBatcher(_rate_batch, RATING_BATCH_WINDOW_S, RATING_BATCH_MAX)
+_STATS = {"fallbacks": 0}
+
+async def rate_message_and_emojis(content: str) -> Tuple[str, List[str]]:
+    if not RATING_BATCH_ENABLED:
+        return await _rate_single(content)
+    try:
+        result = await _RATING_BATCHER.submit(content)
+    except Exception as e:
+        log.warning(f"Batch rating failed, rating individually: {e}")
+        result = None
+    if result is None:
+        _STATS["fallbacks"] += 1
+        return await _rate_single(content)
+    return result
+
+def rating_stats() -> Dict[str, Any]:
+    return {"batching": RATING_BATCH_ENABLED, **_RATING_BATCHER.stats(), **_STATS}
+
 def digit_to_emoji(score: str) -> str | None:
     return NUM_EMOJIS.get(score)
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+_GROUPS: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller starts the
+    work, everyone else arriving while it's in flight awaits the same result.
+    With `cancel_abandoned`, the work is cancelled once every caller waiting
+    on it has been cancelled; otherwise it always runs to completion.
+    """
+
+    def __init__(self, name: str, cancel_abandoned: bool = False):
+        self.name = name
+        self.cancel_abandoned = cancel_abandoned
+        self.calls = 0
+        self.deduplicated = 0
+        self.abandoned = 0
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._waiting: Dict[asyncio.Future, int] = {}
+        _GROUPS[name] = self
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.done() and not task.cancelled():
+            task.exception()  # mark retrieved even if every caller went away
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        else:
+            self.deduplicated += 1
+        self._waiting[task] = self._waiting.get(task, 0) + 1
+        try:
+            # Shielded so one caller being cancelled doesn't cancel the others' result.
+            return await asyncio.shield(task)
+        finally:
+            self._waiting[task] -= 1
+            if not self._waiting[task]:
+                del self._waiting[task]
+                if self.cancel_abandoned and not task.done():
+                    self.abandoned += 1
+                    self._forget(key, task)  # later callers start afresh
+                    task.cancel()
+
+
+def stats() -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for name, group in _GROUPS.items():
+        out[f"{name} calls"] = group.calls
+        out[f"{name} deduplicated"] = group.deduplicated
+        if group.cancel_abandoned:
+            out[f"{name} abandoned"] = group.abandoned
+    return out
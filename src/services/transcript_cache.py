@@ -0,0 +1,47 @@
+import logging
+from typing import Any, Dict, Optional
+
+from src.config import TRANSCRIPT_CACHE_MAX_ROWS, TRANSCRIPT_CACHE_TTL
+from src.models.transcript import Transcript
+from src.persistence import transcript_store
+from src.services import whisper_policy
+
+# Transcripts keyed by the SHA-256 of the downloaded bytes, so forwarded or
+# re-uploaded audio is answered without touching Whisper. Every transcript is
+# stored with the model that made it, but only full-quality rows are served: a
+# fast-model result from a busy moment is redone, and the new row replaces it.
+_STATS = {"hits": 0, "misses": 0, "fast_rows_skipped": 0, "writes": 0, "evicted_rows": 0}
+_EVICT_EVERY = 50
+
+log = logging.getLogger("owl.transcript_cache")
+
+
+def cache_stats() -> Dict[str, Any]:
+    lookups = _STATS["hits"] + _STATS["misses"]
+    return {**_STATS, "hit_rate": (_STATS["hits"] / lookups) if lookups else 0.0}
+
+async def get(sha256: str) -> Optional[Transcript]:
+    try:
+        # Expired rows are misses even if eviction hasn't removed them yet.
+        transcript = await transcript_store.get_transcript(sha256, TRANSCRIPT_CACHE_TTL)
+        if transcript is not None and not whisper_policy.is_full_quality(transcript.model):
+            _STATS["fast_rows_skipped"] += 1
+            transcript = None
+        if transcript is not None:
+            await transcript_store.touch_transcript(sha256)
+    except Exception as e:
+        log.warning(f"Transcript cache read failed: {e}")
+        transcript = None
+    _STATS["hits" if transcript is not None else "misses"] += 1
+    return transcript
+
+async def put(sha256: str, transcript: Transcript) -> None:
+    try:
+        await transcript_store.put_transcript(sha256, transcript)
+        _STATS["writes"] += 1
+        if _STATS["writes"] % _EVICT_EVERY == 0:
+            _STATS["evicted_rows"] += await transcript_store.evict_transcripts(
+                TRANSCRIPT_CACHE_TTL, TRANSCRIPT_CACHE_MAX_ROWS
+            )
+    except Exception as e:
+        log.warning(f"Transcript cache write failed: {e}")
@@ -1,31 +1,305 @@
 import asyncio
+import hashlib
+import logging
 import os
-from typing import Optional
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-import aiohttp
-import whisper
+import numpy as np
 
-from src.config import WHISPER_DEVICE
+from src.config import (
+    SCRATCH_DIR,
+    TRANSCRIBE_MAX_MB,
+    TRANSCRIBE_WINDOW_S,
+    VAD_ENABLED,
+    VAD_MARGIN_DB,
+    VAD_MIN_DB,
+    WHISPER_BACKEND,
+    WHISPER_DEVICE,
+    WHISPER_IDLE_UNLOAD_S,
+    WHISPER_MODEL,
+    WHISPER_PROCESSES,
+)
+from src.models.transcript import Segment, Transcript
+from src.services import whisper_policy
+from src.services.http import get_session
+from src.services.warmup import LazyModel
+from src.services.whisper_pool import WhisperProcessPool, result_payload
 
-_TRANSCRIBER: Optional[whisper.Whisper] = None
+MAX_DOWNLOAD_BYTES = int(TRANSCRIBE_MAX_MB * 1024 * 1024)
+SAMPLE_RATE = 16000  # what Whisper expects
+_CHUNK_SIZE = 64 * 1024
 
-async def _get_transcriber():
-    global _TRANSCRIBER
-    if _TRANSCRIBER is None:
-        _TRANSCRIBER = await asyncio.to_thread(whisper.load_model, "base", device=WHISPER_DEVICE)
-    return _TRANSCRIBER
 
-async def download_file(url: str, save_path: str):
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as resp:
-            resp.raise_for_status()
-            with open(save_path, "wb") as f:
-                f.write(await resp.read())
+class DownloadTooLarge(Exception):
+    pass
 
-async def transcribe_file(path: str) -> str:
-    model = await _get_transcriber()
-    result = await asyncio.to_thread(model.transcribe, path)
-    return result.get("text", "")
+
+class AudioDecodeError(Exception):
+    pass
+
+
+class NoSpeechDetected(Exception):
+    pass
+
+
+@dataclass
+class WindowResult:
+    segments: List[Segment]
+    language: Optional[str]
+    done_s: float
+    total_s: float
+    model: str
+    trimmed_s: float = 0.0
+
+
+def _loader(model_name: str):
+    def load():
+        import whisper  # pulls in torch; only load it when transcription is actually used
+
+        return whisper.load_model(model_name, device=WHISPER_DEVICE)
+    return load
+
+# In-process models by name. The default one is registered for warmup as "whisper",
+# the smaller ones the policy may pick as "whisper-<name>". Any load, warmup
+# included, starts the idle reaper.
+_TRANSCRIBERS: Dict[str, LazyModel] = {
+    WHISPER_MODEL: LazyModel("whisper", _loader(WHISPER_MODEL), on_load=lambda: _ensure_reaper())
+}
+# In-process models are shared by every queue worker; don't run them from two threads at once.
+_MODEL_LOCK = asyncio.Lock()
+
+# Optional process-pool backend; the in-process models above stay as its fallback.
+_POOL = WhisperProcessPool(WHISPER_PROCESSES, WHISPER_MODEL, WHISPER_DEVICE) if WHISPER_BACKEND == "process" else None
+_POOL_READY = LazyModel("whisper-pool", _POOL.warm, on_load=lambda: _ensure_reaper()) if _POOL else None
+_STATS = {"fallbacks": 0, "idle_unloads": 0, "no_speech": 0, "audio_s": 0.0, "trimmed_s": 0.0}
+_REAPER: Optional[asyncio.Task] = None
+
+def _transcriber(model_name: str) -> LazyModel:
+    if model_name not in _TRANSCRIBERS:
+        _TRANSCRIBERS[model_name] = LazyModel(f"whisper-{model_name}", _loader(model_name), on_load=_ensure_reaper)
+    return _TRANSCRIBERS[model_name]
+
+def _is_loaded(model_name: str) -> bool:
+    if _POOL is not None and _POOL.available:
+        return model_name == WHISPER_MODEL and _POOL.running
+    return model_name in _TRANSCRIBERS and _TRANSCRIBERS[model_name].ready.is_set()
+
+async def _reap_idle_models():
+    # Unload models nobody has used for WHISPER_IDLE_UNLOAD_S so RSS drops on quiet days.
+    interval = max(5.0, min(60.0, WHISPER_IDLE_UNLOAD_S / 4))
+    while True:
+        await asyncio.sleep(interval)
+        if _POOL is not None and _POOL.shutdown_if_idle(WHISPER_IDLE_UNLOAD_S):
+            _STATS["idle_unloads"] += 1
+            if _POOL_READY is not None:
+                _POOL_READY.unload()
+        async with _MODEL_LOCK:  # never unload a model mid-transcription
+            for model in _TRANSCRIBERS.values():
+                if model.ready.is_set() and model.idle_for() >= WHISPER_IDLE_UNLOAD_S and model.unload():
+                    _STATS["idle_unloads"] += 1
+
+def _ensure_reaper():
+    global _REAPER
+    if WHISPER_IDLE_UNLOAD_S > 0 and (_REAPER is None or _REAPER.done()):
+        _REAPER = asyncio.create_task(_reap_idle_models())
+
+def scratch_path(filename: str) -> str:
+    """A fresh, unique temp file in SCRATCH_DIR that keeps the upload's extension."""
+    os.makedirs(SCRATCH_DIR, exist_ok=True)
+    ext = os.path.splitext(filename or "")[1][:10]
+    fd, path = tempfile.mkstemp(prefix="owl_", suffix=ext, dir=SCRATCH_DIR)
+    os.close(fd)
+    return path
+
+async def download_file(url: str, save_path: str, max_bytes: int = MAX_DOWNLOAD_BYTES) -> Tuple[int, str]:
+    """
+    Stream url to save_path in chunks; raises DownloadTooLarge past max_bytes.
+    Returns (bytes written, SHA-256 hex digest of the content).
+    """
+    digest = hashlib.sha256()
+    async with get_session().get(url) as resp:
+        resp.raise_for_status()
+        if resp.content_length is not None and resp.content_length > max_bytes:
+            raise DownloadTooLarge()
+        written = 0
+        with open(save_path, "wb") as f:
+            async for chunk in resp.content.iter_chunked(_CHUNK_SIZE):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise DownloadTooLarge()
+                digest.update(chunk)
+                f.write(chunk)
+    return written, digest.hexdigest()
+
+async def load_pcm(path: str) -> np.ndarray:
+    """Decode any ffmpeg-readable file once to mono 16 kHz int16 PCM (without importing whisper/torch)."""
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    out, err = await proc.communicate()
+    if proc.returncode != 0:
+        raise AudioDecodeError(err.decode(errors="ignore").strip()[-300:])
+    return np.frombuffer(out, np.int16)
+
+async def _run_model(audio: np.ndarray, model_name: str, language: Optional[str]) -> Dict[str, Any]:
+    _ensure_reaper()
+    options = {"language": language, "fp16": WHISPER_DEVICE != "cpu"}
+    if _POOL is not None:
+        if _POOL.available:
+            # A WhisperPoolError fails this job: a file that keeps crashing
+            # workers must not get a second try inside the bot process.
+            return await _POOL.transcribe(audio, model_name=model_name, **options)
+        _STATS["fallbacks"] += 1
+        logging.getLogger("owl.transcription").warning("Process backend disabled; using in-process Whisper")
+
+    lazy = _transcriber(model_name)
+    model = await lazy.get()
+    async with _MODEL_LOCK:
+        result = await asyncio.to_thread(model.transcribe, audio, **options)
+    lazy.last_used = time.monotonic()
+    return result_payload(result)
+
+# VAD tuning, in 30 ms frames
+_VAD_FRAME = SAMPLE_RATE * 30 // 1000
+_VAD_PAD_FRAMES = 7        # ~200 ms kept around speech
+_VAD_MIN_GAP_FRAMES = 17   # silences shorter than ~500 ms are kept
+_VAD_MIN_SPEECH_FRAMES = 8  # blips shorter than ~250 ms are dropped
+_VAD_FLOOR_CLEARANCE_DB = 3  # steady noise varies well under this between frames
+
+def detect_speech(pcm: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Lightweight energy VAD over int16 PCM. Returns speech regions as
+    (start, end) sample offsets. The threshold sits a margin above the
+    recording's noise floor, capped so steady speech with no pauses isn't
+    mistaken for noise, and never below VAD_MIN_DB. The cap still stays a
+    few dB above the floor: steady noise (hiss, hum, fans) barely varies
+    from frame to frame, so it never clears it, while speech always has
+    louder syllables.
+    """
+    n = len(pcm) // _VAD_FRAME
+    if n == 0:
+        return []
+    frames = pcm[:n * _VAD_FRAME].astype(np.float32).reshape(n, _VAD_FRAME) / 32768.0
+    db = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    floor = np.percentile(db, 10)
+    cap = max(np.percentile(db, 90) - 20, floor + _VAD_FLOOR_CLEARANCE_DB)
+    threshold = max(VAD_MIN_DB, min(floor + VAD_MARGIN_DB, cap))
+    voiced = db > threshold
+    # Pad speech on both sides so word edges survive.
+    voiced = np.convolve(voiced.astype(np.int8), np.ones(2 * _VAD_PAD_FRAMES + 1, np.int8), "same") > 0
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    regions: List[Tuple[int, int]] = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        if regions and start - regions[-1][1] < _VAD_MIN_GAP_FRAMES:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return [
+        (start * _VAD_FRAME, min(end * _VAD_FRAME, len(pcm)))
+        for start, end in regions
+        if end - start >= _VAD_MIN_SPEECH_FRAMES
+    ]
+
+def _plan_windows(regions: List[Tuple[int, int]], step: int) -> List[List[Tuple[int, int]]]:
+    """Pack speech regions (splitting long ones) into windows of at most `step` samples."""
+    windows: List[List[Tuple[int, int]]] = []
+    current: List[Tuple[int, int]] = []
+    used = 0
+    for start, end in regions:
+        while start < end:
+            take = min(end - start, step - used)
+            current.append((start, start + take))
+            used += take
+            start += take
+            if used >= step:
+                windows.append(current)
+                current, used = [], 0
+    if current:
+        windows.append(current)
+    return windows
+
+def _to_original(t: float, pieces: List[Tuple[int, int]]) -> float:
+    """Map a time in a window's concatenated speech back to the original recording."""
+    offset = t * SAMPLE_RATE
+    for start, end in pieces:
+        if offset <= end - start:
+            return (start + offset) / SAMPLE_RATE
+        offset -= end - start
+    return pieces[-1][1] / SAMPLE_RATE
+
+async def transcribe_windows(
+    path: str, window_s: float = TRANSCRIBE_WINDOW_S, queue_depth: int = 0
+) -> AsyncIterator[WindowResult]:
+    """
+    Decode once, keep only speech (VAD), pick a model for the remaining
+    length and current load, then transcribe windows of speech in order,
+    yielding each window's segments with timestamps in the original
+    recording. The first window's language is reused for the rest.
+    Raises NoSpeechDetected before any model work if there's nothing to transcribe.
+    """
+    pcm = await load_pcm(path)
+    total_s = len(pcm) / SAMPLE_RATE
+    if VAD_ENABLED:
+        regions = detect_speech(pcm)
+    else:
+        regions = [(0, len(pcm))] if len(pcm) else []
+    speech_s = sum(end - start for start, end in regions) / SAMPLE_RATE
+    trimmed_s = total_s - speech_s
+    _STATS["audio_s"] += total_s
+    _STATS["trimmed_s"] += trimmed_s
+    if not regions:
+        _STATS["no_speech"] += 1
+        raise NoSpeechDetected()
+    logging.getLogger("owl.transcription").info(
+        f"VAD kept {speech_s:.1f}s of {total_s:.1f}s ({trimmed_s:.1f}s trimmed, {len(regions)} regions)"
+    )
+
+    model_name = whisper_policy.choose_model(speech_s, queue_depth, _is_loaded)
+    language: Optional[str] = None
+    for pieces in _plan_windows(regions, max(1, int(window_s * SAMPLE_RATE))):
+        audio = np.concatenate([pcm[start:end] for start, end in pieces]).astype(np.float32) / 32768.0
+        loaded = _is_loaded(model_name)
+        t0 = time.perf_counter()
+        result = await _run_model(audio, model_name, language)
+        elapsed = time.perf_counter() - t0
+        if loaded:
+            whisper_policy.observe(model_name, len(audio) / SAMPLE_RATE, elapsed)
+        elif model_name in _TRANSCRIBERS and _TRANSCRIBERS[model_name].load_seconds:
+            whisper_policy.observe(model_name, 0.0, 0.0, load_s=_TRANSCRIBERS[model_name].load_seconds)
+        language = language or result["language"]
+        segments = [
+            Segment(_to_original(start, pieces), _to_original(end, pieces), text.strip())
+            for start, end, text in result["segments"]
+            if text.strip()
+        ]
+        yield WindowResult(segments, language, pieces[-1][1] / SAMPLE_RATE, total_s, model_name, trimmed_s)
+
+def build_transcript(segments: List[Segment], language: Optional[str], model: str = WHISPER_MODEL) -> Transcript:
+    return Transcript(
+        text=" ".join(seg.text for seg in segments),
+        model=model,
+        language=language,
+        segments=segments,
+    )
+
+def backend_stats() -> Dict[str, Any]:
+    out: Dict[str, Any] = {"backend": "process" if _POOL else "thread", **_STATS}
+    if _POOL:
+        out.update(_POOL.stats())
+    return out
+
+def shutdown():
+    if _REAPER is not None:
+        _REAPER.cancel()
+    if _POOL is not None:
+        _POOL.shutdown()
 
 def cleanup(path: str):
     try:
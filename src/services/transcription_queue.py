@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from src.config import TRANSCRIBE_QUEUE_MAX, TRANSCRIBE_WORKERS
+
+log = logging.getLogger("owl.transcription_queue")
+
+
+class QueueFull(Exception):
+    pass
+
+
+@dataclass
+class _Job:
+    guild_id: int
+    run: Callable[[], Awaitable[None]]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class TranscriptionScheduler:
+    """
+    Bounded job queue drained by a fixed number of workers. Jobs are taken
+    round-robin across guilds, so one busy guild can't starve the others.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self._queues: Dict[int, Deque[_Job]] = {}
+        self._order: Deque[int] = deque()  # guilds with queued jobs, next turn first
+        self._size = 0
+        self._available = asyncio.Semaphore(0)
+        self._tasks: List[asyncio.Task] = []
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def depth(self) -> int:
+        return self._size
+
+    def _ensure_workers(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _jobs_ahead(self, guild_id: int) -> int:
+        """
+        Queued jobs that will be dispatched before a new job for `guild_id`.
+        Round r serves every guild with more than r jobs, in `_order`; the new
+        job is ours in round k (k = our queued jobs), after the guilds ahead of us.
+        """
+        k = len(self._queues.get(guild_id, ()))
+        ahead = k
+        before_us = True
+        for g in self._order:
+            if g == guild_id:
+                before_us = False
+                continue
+            ahead += min(len(self._queues[g]), k + 1 if before_us else k)
+        return ahead
+
+    def submit(self, guild_id: int, run: Callable[[], Awaitable[None]]) -> int:
+        """
+        Queue a job. Returns 0 if a worker will pick it up right away,
+        otherwise its position among the jobs waiting for a worker.
+        Raises QueueFull when the queue is at capacity.
+        """
+        if self._size >= self.max_queue:
+            self.rejected += 1
+            raise QueueFull()
+        self._ensure_workers()
+        # Workers not running a job are free, including ones already woken for a
+        # queued job they haven't taken yet; those jobs are counted in `ahead`.
+        free = self.workers - self.running
+        ahead = self._jobs_ahead(guild_id)
+
+        queue = self._queues.get(guild_id)
+        if queue is None:
+            queue = self._queues[guild_id] = deque()
+            self._order.append(guild_id)
+        queue.append(_Job(guild_id, run))
+        self._size += 1
+        self._available.release()
+        return 0 if ahead < free else ahead - free + 1
+
+    def _next_job(self) -> _Job:
+        guild_id = self._order.popleft()
+        queue = self._queues[guild_id]
+        job = queue.popleft()
+        if queue:
+            self._order.append(guild_id)
+        else:
+            del self._queues[guild_id]
+        self._size -= 1
+        return job
+
+    async def _worker(self, idx: int):
+        while True:
+            await self._available.acquire()
+            job = self._next_job()
+            wait = time.monotonic() - job.enqueued_at
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self.running += 1
+            try:
+                await job.run()
+                self.completed += 1
+            except Exception:
+                self.failed += 1
+                log.exception(f"Transcription job for guild {job.guild_id} failed (worker {idx})")
+            finally:
+                self.running -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        started = self.completed + self.failed + self.running
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queue_depth": self._size,
+            "queued_guilds": len(self._queues),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_s": (self._wait_total / started) if started else 0.0,
+            "max_wait_s": self._wait_max,
+        }
+
+
+_SCHEDULER: Optional[TranscriptionScheduler] = None
+
+
+def get_scheduler() -> TranscriptionScheduler:
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        _SCHEDULER = TranscriptionScheduler(TRANSCRIBE_WORKERS, TRANSCRIBE_QUEUE_MAX)
+    return _SCHEDULER
+
+
+def queue_stats() -> Dict[str, Any]:
+    return get_scheduler().stats()
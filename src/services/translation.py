@@ -1,15 +1,32 @@
 # owl/services/translation.py
+import asyncio
+import hashlib
 import logging
 import os
 import re
-from typing import Tuple
+from typing import Any, Dict, List, Tuple
 
-import fasttext
-
-from src.config import FASTTEXT_MODEL_PATH
-from src.services.gpt_utils import get_client
+from src.config import (
+    FASTTEXT_MODEL_PATH,
+    LANGID_BATCH_MAX,
+    LANGID_BATCH_WINDOW_MS,
+    LANGID_CACHE_SIZE,
+    TRANSLATION_CACHE_SIZE,
+    TRANSLATION_SKIP_CONFIDENCE,
+    TRANSLATION_SKIP_ENGLISH,
+)
+from src.services.batching import MicroBatcher
+from src.services import gpt_utils
+from src.services.lru import LRUCache
+from src.services.singleflight import SingleFlight
+from src.services.warmup import LazyModel
 
 _FASTTEXT = None
+_TRANSLATE_FLIGHT = SingleFlight("translation")
+_LANG_CACHE = LRUCache(LANGID_CACHE_SIZE)
+# sha256(normalized text) -> English translation
+_TRANSLATION_CACHE = LRUCache(TRANSLATION_CACHE_SIZE)
+_STATS = {"skipped_english": 0, "translated": 0}
 _FT_URL = "https://dl.fbaipublicfiles.com/fasttext/supervised-models/lid.176.bin"
 
 def _ensure_model_file(path: str) -> None:
@@ -31,29 +48,52 @@ def _ensure_model_file(path: str) -> None:
 def _load_model():
     global _FASTTEXT
     if _FASTTEXT is None:
+        import fasttext  # heavy; only pulled in once detection is actually needed
+
         path = FASTTEXT_MODEL_PATH or "models/lid.176.bin"
         _ensure_model_file(path)
         _FASTTEXT = fasttext.load_model(path)
     return _FASTTEXT
 
+_FASTTEXT_MODEL = LazyModel("fasttext", _load_model)
+
 def clean_mentions(text: str) -> str:
     text = re.sub(r"<@!?[0-9]+>", "", text)
     text = text.replace("\r", "").replace("\u200b", "")
     return text.strip()
 
-def detect_language(text: str) -> Tuple[str, float]:
+async def load_model():
+    """Wait for fastText to be ready, loading (and downloading) it off the event loop if needed."""
+    return await _FASTTEXT_MODEL.get()
+
+def _predict_batch(texts: List[str]) -> List[Tuple[str, float]]:
+    labels, probs = _FASTTEXT.predict(texts, k=1)
+    return [(l[0].replace("__label__", ""), float(p[0])) for l, p in zip(labels, probs)]
+
+async def _detect_batch(texts: List[str]) -> List[Tuple[str, float]]:
+    return await asyncio.to_thread(_predict_batch, texts)
+
+# fastText's predict() takes a list, so messages arriving within a few ms share one call.
+_LANG_BATCHER = MicroBatcher(_detect_batch, LANGID_BATCH_WINDOW_MS / 1000, LANGID_BATCH_MAX)
+
+async def detect_language(text: str) -> Tuple[str, float]:
+    cleaned = clean_mentions(text).replace("\n", " ").strip()
+    cached = _LANG_CACHE.get(cleaned)
+    if cached is not None:
+        return cached
     try:
-        model = _load_model()
-        cleaned = clean_mentions(text).replace("\n", " ").strip()
-        prediction = model.predict(cleaned, k=1)
-        lang_code = prediction[0][0].replace("__label__", "")
-        confidence = float(prediction[1][0])
-        logging.getLogger("owl.translation").info(f"Detected {lang_code} ({confidence:.2f}) for: {cleaned}")
-        return lang_code, confidence
+        await load_model()
+        lang_code, confidence = await _LANG_BATCHER.submit(cleaned)
     except Exception as e:
         logging.getLogger("owl.translation").warning(f"fastText detection failed: {e}")
         # Fallback: unknown language; UI will show 🌐 and we still translate.
         return "und", 0.0
+    logging.getLogger("owl.translation").info(f"Detected {lang_code} ({confidence:.2f}) for: {cleaned}")
+    _LANG_CACHE.put(cleaned, (lang_code, confidence))
+    return lang_code, confidence
+
+def language_stats() -> Dict[str, Any]:
+    return {**_LANG_BATCHER.stats(), **{f"cache {k}": v for k, v in _LANG_CACHE.stats().items()}}
 
 def get_flag(lang_code: str) -> str:
     flags = {
@@ -63,10 +103,32 @@ def get_flag(lang_code: str) -> str:
     }
     return flags.get(lang_code.lower(), "🌐")
 
+def should_translate(lang_code: str, confidence: float) -> bool:
+    """False for text fastText is confident is already English."""
+    if TRANSLATION_SKIP_ENGLISH and lang_code == "en" and confidence >= TRANSLATION_SKIP_CONFIDENCE:
+        _STATS["skipped_english"] += 1
+        return False
+    _STATS["translated"] += 1
+    return True
+
+def translation_stats() -> Dict[str, Any]:
+    return {**_STATS, **{f"cache {k}": v for k, v in _TRANSLATION_CACHE.stats().items()}}
+
 async def translate_to_english(text: str) -> str:
+    normalized = " ".join(text.split())
+    key = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    cached = _TRANSLATION_CACHE.get(key)
+    if cached is not None:
+        return cached
+    # Same text posted by several people at once -> one LLM call.
+    translated = await _TRANSLATE_FLIGHT.do(key, lambda: _translate(text))
+    _TRANSLATION_CACHE.put(key, translated)
+    return translated
+
+async def _translate(text: str) -> str:
     prompt = f"Translate the following to natural English. Only return the translation:\n\n\"{text.strip()}\""
-    client = get_client()
-    res = await client.chat.completions.create(
+    res = await gpt_utils.chat(
+        "translation", gpt_utils.BACKGROUND,
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": prompt}],
         max_tokens=120,
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_MODELS: Dict[str, "LazyModel"] = {}
+
+log = logging.getLogger("owl.warmup")
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+class LazyModel:
+    """
+    A heavy model loaded once, in a worker thread, on first use or by warmup().
+    Callers await get(), which waits for the shared load instead of starting
+    their own; `ready` is set once the model is available. `on_load` runs on
+    the event loop after each successful load.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Any], on_load: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.ready = asyncio.Event()
+        self.value: Any = None
+        self.load_seconds: Optional[float] = None
+        self.last_used: Optional[float] = None  # monotonic time of the last get()
+        self._loader = loader
+        self._on_load = on_load
+        self._task: Optional[asyncio.Task] = None
+        _MODELS[name] = self
+
+    def start(self) -> asyncio.Task:
+        # (Re)start the load unless one is running or already succeeded.
+        if self._task is None or (self._task.done() and not self.ready.is_set()):
+            self._task = asyncio.create_task(self._load())
+        return self._task
+
+    async def _load(self) -> Any:
+        t0 = time.perf_counter()
+        self.value = await asyncio.to_thread(self._loader)
+        self.load_seconds = time.perf_counter() - t0
+        rss = peak_rss_mb()
+        log.info(
+            f"Loaded {self.name} in {self.load_seconds:.2f}s"
+            + (f" (peak RSS {rss:.0f} MB)" if rss is not None else "")
+        )
+        self.ready.set()
+        if self._on_load is not None:
+            self._on_load()
+        return self.value
+
+    async def get(self) -> Any:
+        self.last_used = time.monotonic()
+        if self.ready.is_set():
+            return self.value
+        # Shielded: a cancelled handler must not abort the shared load.
+        return await asyncio.shield(self.start())
+
+    def idle_for(self) -> float:
+        return time.monotonic() - self.last_used if self.last_used is not None else 0.0
+
+    def unload(self) -> bool:
+        """Drop a loaded model so its memory can be reclaimed; the next get() loads it again."""
+        if not self.ready.is_set():
+            return False
+        self.value = None
+        self.ready.clear()
+        self._task = None
+        log.info(f"Unloaded {self.name} after {self.idle_for():.0f}s idle")
+        return True
+
+
+async def _warm(model: LazyModel):
+    try:
+        await model.get()
+    except Exception as e:
+        log.warning(f"Warmup of {model.name} failed: {e}")
+
+
+def warmup(names: Iterable[str]):
+    """Start background loads for the named models (unknown names are logged and skipped)."""
+    for name in names:
+        model = _MODELS.get(name)
+        if model is None:
+            log.info(f"Warmup: no model named {name!r} is registered (feature not loaded?)")
+            continue
+        asyncio.create_task(_warm(model))
+
+
+def warmup_stats() -> Dict[str, Any]:
+    out: Dict[str, Any] = {
+        name: (f"ready ({m.load_seconds:.1f}s)" if m.ready.is_set() else "not loaded")
+        for name, m in _MODELS.items()
+    }
+    rss = peak_rss_mb()
+    if rss is not None:
+        out["peak RSS MB"] = rss
+    return out
@@ -0,0 +1,86 @@
+import logging
+from typing import Any, Callable, Dict, List
+
+from src.config import (
+    WHISPER_ADAPTIVE,
+    WHISPER_BUSY_QUEUE_DEPTH,
+    WHISPER_FAST_MODEL,
+    WHISPER_LATENCY_BUDGET_S,
+    WHISPER_MODEL,
+)
+
+log = logging.getLogger("owl.whisper_policy")
+
+# Smallest to largest. The policy never goes above WHISPER_MODEL.
+MODEL_SIZES = ["tiny", "base", "small", "medium", "large"]
+
+# Starting guesses, replaced by observed values as jobs run:
+# seconds of compute per second of audio (CPU), and seconds to load the model.
+_REALTIME_FACTOR: Dict[str, float] = {"tiny": 0.05, "base": 0.12, "small": 0.35, "medium": 1.0, "large": 2.0}
+_LOAD_SECONDS: Dict[str, float] = {"tiny": 1.0, "base": 2.0, "small": 5.0, "medium": 12.0, "large": 25.0}
+_EMA_WEIGHT = 0.2
+
+_CHOSEN: Dict[str, int] = {}
+
+
+def _size(name: str) -> int:
+    base = name.split(".")[0]  # "base.en" -> "base"
+    return MODEL_SIZES.index(base) if base in MODEL_SIZES else len(MODEL_SIZES)
+
+
+def is_full_quality(model: str) -> bool:
+    """True for WHISPER_MODEL or anything at least as large."""
+    return _size(model) >= _size(WHISPER_MODEL)
+
+
+def candidates() -> List[str]:
+    """Configured fast model up to the configured (max quality) model, smallest first."""
+    top = _size(WHISPER_MODEL)
+    out = [m for m in MODEL_SIZES if _size(WHISPER_FAST_MODEL) <= _size(m) < top]
+    return out + [WHISPER_MODEL]
+
+
+def estimate_seconds(model: str, duration_s: float, queue_depth: int, loaded: bool) -> float:
+    rtf = _REALTIME_FACTOR.get(model.split(".")[0], 1.0)
+    load = 0.0 if loaded else _LOAD_SECONDS.get(model.split(".")[0], 10.0)
+    # Work already queued runs on the same hardware, so stretch the estimate by it.
+    return load + duration_s * rtf * (1 + queue_depth)
+
+
+def choose_model(duration_s: float, queue_depth: int, is_loaded: Callable[[str], bool]) -> str:
+    """
+    Largest model (up to WHISPER_MODEL) whose estimated time fits the latency
+    budget; the fast model when the queue is deep or nothing fits.
+    """
+    if not WHISPER_ADAPTIVE:
+        choice = WHISPER_MODEL
+    elif queue_depth >= WHISPER_BUSY_QUEUE_DEPTH:
+        choice = WHISPER_FAST_MODEL
+    else:
+        choice = WHISPER_FAST_MODEL
+        for model in reversed(candidates()):
+            if estimate_seconds(model, duration_s, queue_depth, is_loaded(model)) <= WHISPER_LATENCY_BUDGET_S:
+                choice = model
+                break
+    _CHOSEN[choice] = _CHOSEN.get(choice, 0) + 1
+    log.info(f"Chose whisper '{choice}' for {duration_s:.1f}s of audio (queue depth {queue_depth})")
+    return choice
+
+
+def observe(model: str, audio_s: float, compute_s: float, load_s: float = 0.0):
+    """Feed back measured timings so the estimates track this machine."""
+    key = model.split(".")[0]
+    if audio_s > 1.0:
+        rtf = compute_s / audio_s
+        prev = _REALTIME_FACTOR.get(key)
+        _REALTIME_FACTOR[key] = rtf if prev is None else (1 - _EMA_WEIGHT) * prev + _EMA_WEIGHT * rtf
+    if load_s > 0:
+        _LOAD_SECONDS[key] = load_s
+
+
+def policy_stats() -> Dict[str, Any]:
+    out: Dict[str, Any] = {"adaptive": WHISPER_ADAPTIVE, "budget_s": WHISPER_LATENCY_BUDGET_S}
+    for model, count in _CHOSEN.items():
+        out[f"chose {model}"] = count
+        out[f"rtf {model}"] = _REALTIME_FACTOR.get(model.split(".")[0], 0.0)
+    return out
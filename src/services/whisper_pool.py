@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+log = logging.getLogger("owl.whisper_pool")
+
+# ---------------- Worker process side ----------------
+
+_WORKER_MODELS: Dict[str, Any] = {}
+_WORKER_DEVICE = "cpu"
+
+
+def _worker_model(name: str):
+    if name not in _WORKER_MODELS:
+        import whisper
+
+        _WORKER_MODELS[name] = whisper.load_model(name, device=_WORKER_DEVICE)
+    return _WORKER_MODELS[name]
+
+
+def _init_worker(model_name: str, device: str):
+    # Runs once per worker process: load the default model before taking any job.
+    global _WORKER_DEVICE
+    _WORKER_DEVICE = device
+    _worker_model(model_name)
+
+
+def _ping() -> bool:
+    return bool(_WORKER_MODELS)
+
+
+def result_payload(result: Dict[str, Any]) -> Dict[str, Any]:
+    """The picklable subset of a whisper result that callers use."""
+    return {
+        "text": result.get("text", ""),
+        "language": result.get("language"),
+        "segments": [(seg["start"], seg["end"], seg["text"]) for seg in result.get("segments") or []],
+    }
+
+
+def _transcribe_in_worker(audio: Any, model_name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    return result_payload(_worker_model(model_name).transcribe(audio, **options))
+
+# ---------------- Bot process side ----------------
+
+
+class WhisperPoolError(Exception):
+    pass
+
+
+class WhisperProcessPool:
+    """
+    Whisper in separate worker processes, so decoding never competes with the
+    bot's event loop for the GIL. Jobs are file paths or PCM arrays. A crashed
+    pool is rebuilt and the job retried once; after repeated crashes the pool
+    is disabled for a while so callers fall back to the in-process backend.
+    """
+
+    MAX_CONSECUTIVE_CRASHES = 3
+    DISABLE_SECONDS = 300
+
+    def __init__(self, processes: int, model_name: str, device: str):
+        self.processes = max(1, processes)
+        self.model_name = model_name
+        self.device = device
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._consecutive_crashes = 0
+        self._disabled_until = 0.0
+        self._in_flight = 0
+        self._last_used = time.monotonic()
+        self.jobs = 0
+        self.crashes = 0
+        self.restarts = 0
+        self.idle_shutdowns = 0
+
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.device),
+            )
+        return self._pool
+
+    def _discard(self, pool: ProcessPoolExecutor):
+        if self._pool is pool:
+            self._pool = None
+            self.restarts += 1
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def warm(self) -> "WhisperProcessPool":
+        """Blocking: start the workers and wait until they have loaded the model."""
+        pool = self._ensure_pool()
+        for fut in [pool.submit(_ping) for _ in range(self.processes)]:
+            fut.result()
+        return self
+
+    async def transcribe(self, audio: Any, model_name: Optional[str] = None, **options) -> Dict[str, Any]:
+        """Transcribe a file path or a 16 kHz float32 PCM array in a worker process."""
+        self._in_flight += 1
+        try:
+            return await self._transcribe(audio, model_name or self.model_name, options)
+        finally:
+            self._in_flight -= 1
+            self._last_used = time.monotonic()
+
+    async def _transcribe(self, audio: Any, model_name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.available:
+            raise WhisperPoolError("process pool temporarily disabled after repeated crashes")
+        if self._disabled_until:
+            # Re-enabled: crashes from before (or during) the window don't count any more.
+            self._disabled_until = 0.0
+            self._consecutive_crashes = 0
+        for attempt in (1, 2):
+            pool = self._ensure_pool()
+            try:
+                result = await asyncio.wrap_future(pool.submit(_transcribe_in_worker, audio, model_name, options))
+            except BrokenProcessPool:
+                self.crashes += 1
+                self._consecutive_crashes += 1
+                log.warning(f"Whisper worker pool crashed (attempt {attempt}); restarting it")
+                self._discard(pool)
+                if self._consecutive_crashes >= self.MAX_CONSECUTIVE_CRASHES:
+                    self._disabled_until = time.monotonic() + self.DISABLE_SECONDS
+                    log.error(f"Whisper process pool disabled for {self.DISABLE_SECONDS}s after repeated crashes")
+                    break
+                continue
+            self.jobs += 1
+            self._consecutive_crashes = 0
+            return result
+        raise WhisperPoolError("worker process crashed")
+
+    def shutdown_if_idle(self, idle_s: float) -> bool:
+        """Stop the workers (freeing their models) once nothing has run for idle_s seconds."""
+        if self._pool is None or self._in_flight or time.monotonic() - self._last_used < idle_s:
+            return False
+        self.shutdown()
+        self.idle_shutdowns += 1
+        log.info(f"Whisper worker pool stopped after {idle_s:.0f}s idle")
+        return True
+
+    def shutdown(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "processes": self.processes,
+            "running": self.running,
+            "jobs": self.jobs,
+            "crashes": self.crashes,
+            "restarts": self.restarts,
+            "idle_shutdowns": self.idle_shutdowns,
+            "disabled": not self.available,
+        }
@@ -0,0 +1,17 @@
+from src.cogs.dictionary_watcher import split_terms
+
+
+def test_single_comma_is_one_phrase():
+    assert split_terms("well, actually") == ["well, actually"]
+
+
+def test_two_commas_make_a_list():
+    assert split_terms("owl, hawk, Owl") == ["owl", "hawk"]
+
+
+def test_newlines_make_a_list():
+    assert split_terms("- owl\n2. hawk, falcon") == ["owl", "hawk", "falcon"]
+
+
+def test_single_word():
+    assert split_terms("  owl \n") == ["owl"]
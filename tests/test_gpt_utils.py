@@ -0,0 +1,30 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.services import gpt_utils
+from src.services.gpt_utils import BACKGROUND, INTERACTIVE, OpenAIScheduler
+
+
+def _fake_client(sent):
+    async def create(**kwargs):
+        sent.append(kwargs["messages"][0]["content"])
+        return SimpleNamespace(usage=None)
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_interactive_goes_ahead_of_queued_background_when_rate_limited(monkeypatch):
+    sent = []
+    monkeypatch.setattr(gpt_utils, "get_client", lambda: _fake_client(sent))
+
+    async def run():
+        scheduler = OpenAIScheduler(rpm=6000, tpm=10_000_000, concurrency=8, max_retries=0)
+        scheduler.requests.tokens = 0  # drained: every call waits for a refill
+        ask = lambda label, priority: scheduler.chat(
+            "test", priority, messages=[{"role": "user", "content": label}]
+        )
+        background = [asyncio.create_task(ask(f"bg{i}", BACKGROUND)) for i in range(20)]
+        await asyncio.sleep(0)
+        await asyncio.gather(ask("interactive", INTERACTIVE), *background)
+
+    asyncio.run(run())
+    assert sent == ["interactive"] + [f"bg{i}" for i in range(20)]
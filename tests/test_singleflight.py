@@ -0,0 +1,38 @@
+import asyncio
+
+from src.services.singleflight import SingleFlight
+
+
+def _run_with_waiters(flight, cancel):
+    """Start the shared work from two callers, cancel `cancel` of them, then report how the work ended."""
+    async def run():
+        ended = asyncio.get_running_loop().create_future()
+
+        async def work():
+            try:
+                await asyncio.sleep(0.05)
+                ended.set_result("finished")
+            except asyncio.CancelledError:
+                ended.set_result("cancelled")
+                raise
+            return "done"
+
+        callers = [asyncio.create_task(flight.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers[:cancel]:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        return await ended
+    return asyncio.run(run())
+
+
+def test_abandoned_work_is_cancelled():
+    assert _run_with_waiters(SingleFlight("test-abandon-all", cancel_abandoned=True), cancel=2) == "cancelled"
+
+
+def test_work_runs_while_a_caller_still_waits():
+    assert _run_with_waiters(SingleFlight("test-abandon-one", cancel_abandoned=True), cancel=1) == "finished"
+
+
+def test_work_runs_to_completion_by_default():
+    assert _run_with_waiters(SingleFlight("test-keep"), cancel=2) == "finished"
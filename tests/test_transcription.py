@@ -0,0 +1,60 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.services import transcription
+from src.services.transcription import SAMPLE_RATE, NoSpeechDetected, detect_speech
+
+
+def _pcm(signal):
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+
+def _at_dbfs(signal, db):
+    return signal / np.sqrt(np.mean(signal ** 2)) * 10 ** (db / 20)
+
+
+async def _empty_pcm(path):
+    return np.zeros(0, np.int16)
+
+
+async def _first_window(path):
+    async for window in transcription.transcribe_windows(path):
+        return window
+
+
+@pytest.mark.parametrize("vad", [True, False])
+def test_empty_audio_is_no_speech(monkeypatch, vad):
+    monkeypatch.setattr(transcription, "load_pcm", _empty_pcm)
+    monkeypatch.setattr(transcription, "VAD_ENABLED", vad)
+    with pytest.raises(NoSpeechDetected):
+        asyncio.run(_first_window("empty.ogg"))
+
+
+@pytest.mark.parametrize("db", [-44, -38, -30])
+def test_steady_noise_is_not_speech(db):
+    noise = np.random.default_rng(0).standard_normal(20 * SAMPLE_RATE)
+    assert detect_speech(_pcm(_at_dbfs(noise, db))) == []
+
+
+def test_tone_between_silences_is_kept():
+    t = np.arange(2 * SAMPLE_RATE) / SAMPLE_RATE
+    tone = _at_dbfs(np.sin(2 * np.pi * 220 * t), -20)
+    silence = np.zeros(SAMPLE_RATE)
+    regions = detect_speech(_pcm(np.concatenate([silence, tone, silence])))
+    assert len(regions) == 1
+    start, end = regions[0]
+    assert 0.7 * SAMPLE_RATE <= start <= SAMPLE_RATE
+    assert 3 * SAMPLE_RATE <= end <= 3.3 * SAMPLE_RATE
+
+
+def test_speech_burst_in_steady_noise_drops_the_noise():
+    noise = _at_dbfs(np.random.default_rng(0).standard_normal(10 * SAMPLE_RATE), -40)
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    noise[4 * SAMPLE_RATE:5 * SAMPLE_RATE] += _at_dbfs(np.sin(2 * np.pi * 300 * t), -20)
+    regions = detect_speech(_pcm(noise))
+    assert len(regions) == 1
+    start, end = regions[0]
+    assert 3.7 * SAMPLE_RATE <= start <= 4 * SAMPLE_RATE
+    assert 5 * SAMPLE_RATE <= end <= 5.3 * SAMPLE_RATE
@@ -0,0 +1,46 @@
+import asyncio
+
+from src.services.transcription_queue import QueueFull, TranscriptionScheduler
+
+
+async def _noop():
+    await asyncio.sleep(0)
+
+
+def _submit_all(workers, guilds, max_queue=20):
+    async def run():
+        scheduler = TranscriptionScheduler(workers, max_queue)
+        # No awaits between submits: workers are woken but haven't taken a job yet.
+        positions = [scheduler.submit(g, _noop) for g in guilds]
+        await scheduler.stop()
+        return positions
+    return asyncio.run(run())
+
+
+def test_back_to_back_jobs_from_one_guild():
+    assert _submit_all(1, [1, 1, 1, 1]) == [0, 1, 2, 3]
+
+
+def test_back_to_back_jobs_with_two_workers():
+    assert _submit_all(2, [1, 1, 1, 1]) == [0, 0, 1, 2]
+
+
+def test_positions_follow_round_robin_order():
+    # Guild 2 joins the rotation: dispatch becomes 1, 2, 1, 2, 1, so its jobs
+    # wait behind one and three jobs respectively.
+    assert _submit_all(1, [1, 1, 1, 2, 2]) == [0, 1, 2, 1, 3]
+
+
+def test_queue_full():
+    async def run():
+        scheduler = TranscriptionScheduler(1, 2)
+        scheduler.submit(1, _noop)
+        scheduler.submit(1, _noop)
+        try:
+            scheduler.submit(1, _noop)
+        except QueueFull:
+            return True
+        finally:
+            await scheduler.stop()
+        return False
+    assert asyncio.run(run())